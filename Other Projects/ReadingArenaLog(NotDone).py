@@ -1,16 +1,30 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import filedialog
-import re
+
+# Make the project package importable when running this script directly
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mtgaseer.arena_log import EVENT_LOGIN, PlayerLogReader
+
+# Incremental reader, only the lines appended since the last poll are parsed
+log_reader = None
 
 
 def read_log_file():
-    # Use the file path from the entry widget
+    global log_reader
+    # Use the file path from the entry widget (a new path starts a new reader)
     file_path = file_path_entry.get()
+    if log_reader is None or log_reader.file_path != file_path:
+        log_reader = PlayerLogReader(file_path)
+        username_label.config(text="Username: Not found")
     try:
-        with open(file_path, "r") as file:
-            log_data = file.read()
-            username = extract_username(log_data)
-            username_label.config(text="Username: " + username)
+        for event in log_reader.poll():
+            if event.kind == EVENT_LOGIN:
+                username_label.config(
+                    text="Username: " + event.data["display_name"]
+                )
     except Exception as e:
         username_label.config(text="Error: " + str(e))
 
@@ -18,14 +32,6 @@ def read_log_file():
     root.after(2000, read_log_file)
 
 
-def extract_username(log_text):
-    matches = re.findall(
-        r"\[Accounts - Login\] Logged in successfully. Display Name: (.+?#\d+)",
-        log_text,
-    )
-    return matches[-1] if matches else "Not found"
-
-
 # Create the main window
 root = tk.Tk()
 root.title("Log Reader")
@@ -1,19 +1,17 @@
-import pandas as pd
-import numpy as np
+import os
+import sys
+
+# Make the project package importable when running this script directly
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mtgaseer.analysis import biggest_differences
+from mtgaseer.cleaning import read_card_ratings
 
 
 def read_data(file_path):
     try:
-        data = pd.read_csv(file_path)
-        # Clean 'GIH WR' column
-        data["GIH WR"] = (
-            data["GIH WR"]
-            .str.strip()  # Remove leading/trailing white spaces
-            .replace("%", "", regex=True)  # Remove '%' sign
-            .replace("", 0)  # Replace empty strings with 0
-            .astype(float)  # Convert to float
-        )
-        return data
+        # Same cleaning as the main app ('GIH WR' becomes float, blanks NaN)
+        return read_card_ratings(file_path)
     except FileNotFoundError:
         print(f"File not found: {file_path}")
         return None
@@ -32,31 +30,18 @@ color_files = [
     for combo in color_combinations
 ]
 
-# Dictionary to hold the differences
-differences = {}
-
-# Iterate through each color file
+# Cleaned data of each color combination file that could be read
+color_data = {}
 for file_path in color_files:
-    color_data = read_data(file_path)
-    if color_data is not None:
-        # Merge with the general data on 'Card Name'
-        merged_data = general_data.merge(
-            color_data, on="Name", suffixes=("_general", "_color")
-        )
-        # Calculate the difference in 'GIH WR'
-        merged_data["difference"] = np.abs(
-            merged_data["GIH WR_general"] - merged_data["GIH WR_color"]
-        )
-        # Update differences dictionary
-        for _, row in merged_data.iterrows():
-            card_name = row["Name"]
-            diff = row["difference"]
-            if not np.isnan(diff) and diff > differences.get(card_name, (0, ""))[0]:
-                differences[card_name] = (diff, file_path)
-
-# Get the top 10 differences
-top_10 = sorted(differences.items(), key=lambda x: x[1][0], reverse=True)[:10]
+    data = read_data(file_path)
+    if data is not None:
+        color_data[file_path] = data
+
+# Biggest 'GIH WR' difference of each card, top 10 cards (vectorized)
+top_10 = biggest_differences(general_data, color_data, stats=["GIH WR"], top=10)
 
 # Print the results
-for card, (diff, file_name) in top_10:
+for card, diff, file_name in zip(
+    top_10["Name"], top_10["Difference"].abs(), top_10["Archetype"]
+):
     print(f"Card: {card}, Difference: {diff}, File: {file_name}")
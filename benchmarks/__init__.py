@@ -0,0 +1,2 @@
+# MTGA Seer benchmarks - synthetic 17lands exports and timings of the hot paths
+# (python -m benchmarks --help).
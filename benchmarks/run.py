@@ -0,0 +1,366 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import write_synthetic_data
+from benchmarks.widgets import TABLE_HEIGHT, create_table_widgets
+from mtgaseer.analysis import biggest_differences
+from mtgaseer.card_registry import CardRegistry
+from mtgaseer.catalog import DataCatalog
+from mtgaseer.cleaning import clean_card_ratings, read_card_ratings, read_color_ratings
+from mtgaseer.column_widths import ColumnWidthCache
+from mtgaseer.columnar_cache import ColumnarCache
+from mtgaseer.dataset_store import DatasetStore
+from mtgaseer.estimates import with_estimates
+from mtgaseer.filters import CardFilter
+from mtgaseer.ingest import DEFAULT_INGEST_WORKERS, load_snapshot
+from mtgaseer.ranking import CardRanking
+from mtgaseer.search_index import NameIndex
+from mtgaseer.table_view import TableView
+
+
+#######################################################
+# BENCHMARKS OF THE HOT PATHS (python -m benchmarks)
+#######################################################
+
+# Sizes of the generated data, in multiples of the shipped data folder
+DEFAULT_SCALES = [1, 10, 100]
+
+# Timed runs of every stage (the best and the median are reported)
+DEFAULT_REPEAT = 5
+
+# Changing the stages or the report layout should change this number
+REPORT_VERSION = 1
+
+# Columns of the benchmark card table, as (heading, data column) pairs
+TABLE_COLUMNS = [
+    ("Card Name", "Name"),
+    ("Avg. Pick Turn", "ALSA"),
+    ("Color", "Color"),
+    ("Rarity", "Rarity"),
+    ("Games Played %", "% GP"),
+    ("WinRate In Hand (%)", "GIH WR"),
+    (" (% WR H - % WR not H)", "IWD"),
+]
+
+# Filters of the filter stages (black or red uncommons, GIH WR >= 58, # GIH
+# >= 500)
+FILTER_CONDITIONS = {
+    "colors": ["B", "R"],
+    "rarities": ["U"],
+    "ranges": [("GIH WR", 58, None), ("# GIH", 500, None)],
+}
+
+
+# Function to time a stage: `function(*setup())` is run `repeat` times (the
+# setup is not timed), then once more under tracemalloc for the peak memory
+# allocated by Python and NumPy
+def measure(function, setup=None, repeat=DEFAULT_REPEAT):
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        gc.collect()
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup() if setup is not None else ()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_kib": peak // 1024,
+    }
+
+
+# Function to benchmark every stage on the newest snapshot of a data folder.
+# Returns the data sizes and the measures by stage, in the order run.
+def benchmark_data(
+    data_dir, repeat=DEFAULT_REPEAT, workers=DEFAULT_INGEST_WORKERS, tk_mode="auto"
+):
+    catalog = DataCatalog(data_dir)
+    snapshot = catalog.latest()
+    if snapshot is None:
+        raise ValueError(f"No 17lands card ratings files found in {data_dir}")
+    files = catalog.card_ratings_files(snapshot)
+    paths = list(files.values())
+    colors_file = catalog.colors_file(snapshot)
+
+    raw = [pd.read_csv(path, encoding="utf-8-sig") for path in paths]
+    data = {key: read_card_ratings(path) for key, path in files.items()}
+    overall = data[None]
+    archetypes = {key: table for key, table in data.items() if key is not None}
+    all_rows = np.arange(len(overall), dtype=np.intp)
+    stages = {}
+
+    def stage(name, function, setup=None):
+        stages[name] = measure(function, setup, repeat)
+
+    # Parsing and cleaning
+    stage("catalog_scan", lambda: DataCatalog(data_dir))
+    stage("read_csv", lambda: [pd.read_csv(p, encoding="utf-8-sig") for p in paths])
+    stage(
+        "clean_card_ratings",
+        lambda frames: [clean_card_ratings(frame) for frame in frames],
+        lambda: ([frame.copy() for frame in raw],),
+    )
+    if colors_file is not None:
+        stage("read_color_ratings", lambda: read_color_ratings(colors_file))
+    for name, stage_workers in [("serial", 1), ("parallel", workers)]:
+        stage(
+            f"load_snapshot_{name}",
+            lambda store, w=stage_workers: load_snapshot(store, colors_file, workers=w),
+            lambda: (_dataset_store(files),),
+        )
+
+    cache_dir = tempfile.mkdtemp(prefix="mtgaseer-benchmark-cache-")
+    try:
+        cached_loader = ColumnarCache(read_card_ratings, cache_dir)
+        for path in paths:
+            cached_loader(path)  # Compiled once, then only loaded
+        stage("columnar_cache_load", lambda: [cached_loader(path) for path in paths])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # Derived data of a dataset
+    queries = _typed_queries(overall)
+    stage("name_index_build", lambda: NameIndex.from_data(overall))
+    stage(
+        "name_search_typing",
+        lambda index: [index.search(query) for query in queries],
+        lambda: (NameIndex.from_data(overall),),
+    )
+    stage("card_filter_build", lambda: CardFilter.from_data(overall))
+    card_filter = CardFilter.from_data(overall)
+    stage("card_filter_query", lambda: card_filter.apply(all_rows, **FILTER_CONDITIONS))
+    stage("card_ranking", lambda: CardRanking(overall))
+    stage("estimates", lambda: with_estimates(overall))
+    stage(
+        "card_registry_tables",
+        lambda: [CardRegistry().table(table, ["GIH WR"]) for table in data.values()],
+    )
+    if archetypes:
+        stage("biggest_differences", lambda: biggest_differences(overall, archetypes))
+
+    # Card table (Treeview)
+    headings = [heading for heading, _ in TABLE_COLUMNS]
+    tree, scrollbar, font, tk_mode, close = create_table_widgets(headings, tk_mode)
+    try:
+        table = TableView(
+            tree,
+            TABLE_COLUMNS,
+            scrollbar=scrollbar,
+            virtual=True,
+            column_widths=ColumnWidthCache(font),
+        )
+        stage(
+            "column_widths",
+            lambda cache: cache.resize_columns(tree, overall, TABLE_COLUMNS),
+            lambda: (ColumnWidthCache(font),),
+        )
+        stage("table_set_data", lambda: table.set_data(overall))
+        stage(
+            "table_sort",
+            lambda: [
+                table.sort_by(heading, reverse)
+                for heading in headings
+                for reverse in (False, True)
+            ],
+        )
+        filtered = card_filter.apply(all_rows, **FILTER_CONDITIONS)
+        stage("table_show_filtered", lambda: table.show(filtered))
+
+        # Back to the top of the whole table, then 100 pages down
+        table.show()
+
+        def scroll_pages():
+            table.scroll(-len(table.rows))
+            for _ in range(100):
+                table.scroll(TABLE_HEIGHT)
+
+        stage("table_scroll", scroll_pages)
+    finally:
+        close()
+
+    return {
+        "files": len(paths),
+        "overall_rows": len(overall),
+        "total_rows": sum(len(table) for table in data.values()),
+        "tk": tk_mode,
+        "stages": stages,
+    }
+
+
+# Function to generate the data of each scale in turn and benchmark it.
+# Returns the report (a JSON-compatible dict).
+def run_benchmarks(
+    scales=DEFAULT_SCALES,
+    sets=1,
+    repeat=DEFAULT_REPEAT,
+    workers=DEFAULT_INGEST_WORKERS,
+    tk_mode="auto",
+    keep_data=None,
+    progress=print,
+):
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "workers": workers,
+        "scales": {},
+    }
+    for scale in scales:
+        if keep_data is not None:
+            data_dir = os.path.join(keep_data, f"scale-{scale}")
+        else:
+            data_dir = tempfile.mkdtemp(prefix=f"mtgaseer-benchmark-{scale}x-")
+        try:
+            progress(f"Scale {scale}x: writing the data in {data_dir}")
+            write_synthetic_data(data_dir, scale, sets)
+            progress(f"Scale {scale}x: running the stages")
+            result = benchmark_data(data_dir, repeat, workers, tk_mode)
+        finally:
+            if keep_data is None:
+                shutil.rmtree(data_dir, ignore_errors=True)
+        result["sets"] = sets
+        report["scales"][str(scale)] = result
+    return report
+
+
+# Function to compare the stages of two reports, returns the lines of a text
+# table (median times, and new / old)
+def compare_reports(old, new):
+    lines = [f"{'Stage':<28}{'Old (ms)':>12}{'New (ms)':>12}{'Ratio':>8}"]
+    for scale, result in new["scales"].items():
+        old_stages = old["scales"].get(scale, {}).get("stages", {})
+        lines.append(f"-- {scale}x")
+        for name, measures in result["stages"].items():
+            new_ms = 1000 * measures["median_s"]
+            if name not in old_stages:
+                lines.append(f"{name:<28}{'-':>12}{new_ms:>12.2f}{'-':>8}")
+                continue
+            old_ms = 1000 * old_stages[name]["median_s"]
+            ratio = new_ms / old_ms if old_ms else float("nan")
+            lines.append(f"{name:<28}{old_ms:>12.2f}{new_ms:>12.2f}{ratio:>8.2f}")
+    return lines
+
+
+# Function to show the stages of a report as a text table
+def format_report(report):
+    lines = []
+    for scale, result in report["scales"].items():
+        lines.append(
+            f"-- {scale}x: {result['files']} files, {result['total_rows']} rows"
+            f" (Tk: {result['tk']})"
+        )
+        for name, measures in result["stages"].items():
+            lines.append(
+                f"{name:<28}{1000 * measures['median_s']:>10.2f} ms"
+                f"{measures['peak_kib']:>12} KiB"
+            )
+    return lines
+
+
+# Function to build the argument parser of the benchmarks
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time and memory-profile the MTGA Seer hot paths on "
+        "synthetic 17lands exports (no display needed).",
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SCALES,
+        help="data sizes, in multiples of the shipped data folder",
+    )
+    parser.add_argument("--sets", type=int, default=1, help="sets per data folder")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_INGEST_WORKERS)
+    parser.add_argument(
+        "--tk",
+        choices=["auto", "real", "stub"],
+        default="auto",
+        help="Treeview used by the table stages (auto: real Tk with a display)",
+    )
+    parser.add_argument(
+        "--output", default="benchmark.json", help="JSON report written"
+    )
+    parser.add_argument("--compare", help="JSON report of an earlier run")
+    parser.add_argument("--keep-data", help="folder where the generated data is kept")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run_benchmarks(
+        args.scales, args.sets, args.repeat, args.workers, args.tk, args.keep_data
+    )
+    with open(args.output, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    lines = format_report(report)
+    if args.compare:
+        try:
+            with open(args.compare, encoding="utf-8") as baseline_file:
+                lines = compare_reports(json.load(baseline_file), report)
+        except (OSError, ValueError) as error:
+            print(f"Cannot read {args.compare}: {error}", file=sys.stderr)
+            return 1
+    print("\n".join(lines))
+    print(args.output)
+    return 0
+
+
+# Dataset store with the card ratings files of a snapshot, nothing parsed yet
+def _dataset_store(files):
+    dataset_store = DatasetStore(read_card_ratings)
+    dataset_store.register_many(files)
+    return dataset_store
+
+
+# Queries typed one character at a time to find a card, then cleared
+def _typed_queries(data):
+    if not len(data):
+        return [""]
+    name = str(data["Name"].iloc[len(data) // 2]).lower()
+    return [name[:length] for length in range(1, len(name) + 1)] + [""]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
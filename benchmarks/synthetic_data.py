@@ -0,0 +1,176 @@
+import csv
+import os
+
+import numpy as np
+
+from mtgaseer.cleaning import CARD_RATINGS_COLUMNS
+from mtgaseer.datasets import ARCHETYPE_CODES, ARCHETYPE_NAMES
+
+
+#######################################################
+# SYNTHETIC 17LANDS EXPORTS
+#######################################################
+
+# Cards in one set of the shipped data folder (scale 1)
+BASE_CARDS = 286
+
+# Export date of the generated files
+DEFAULT_DATE = "2024-01-01"
+
+# Color of the cards (blank: colorless) and how often it appears
+_COLORS = ["W", "U", "B", "R", "G", "", "WU", "UB", "BR", "RG", "WG", "WRG"]
+_COLOR_WEIGHTS = [15, 15, 15, 15, 15, 13, 2, 2, 2, 2, 2, 2]
+
+# Rarity codes and how often they appear (B: bonus sheet)
+_RARITIES = ["C", "U", "R", "M", "B"]
+_RARITY_WEIGHTS = [35, 32, 22, 8, 3]
+
+# Share of the cells of a win rate left blank (too few games, bonus sheet)
+_BLANK_RATE = 0.04
+
+# Share of the cards missing from an archetype file (never played in it)
+_ARCHETYPE_MISSING_RATE = 0.1
+
+# Words the card names are made of
+_NAME_WORDS = (
+    "Aclazotz Bonehoard Cavern Deepfathom Echo Fungal Gishath Huatli Itzquinth "
+    "Jade Kellan Lodestone Malcolm Nicanzil Ojer Pathfinder Quintorius Relic "
+    "Sovereign Tithing Uchbenbak Vito Waterlogged Xolatoyac Yeva Zoyowa Dinosaur "
+    "Vampire Merfolk Pirate"
+).split()
+_TITLES = ["the Gorging", "Deepest Betrayal", "Cosmium Raider", "Firstborn"]
+
+
+# Function to write a synthetic data folder `scale` times the size of the
+# shipped one, for `sets` sets (one sub-folder each when there are several).
+# Every set gets an overall card ratings file, one file per archetype and a
+# colors file, written like the 17lands exports: UTF-8 with a BOM, quoted
+# names with commas and quotes, blank cells, and "%"/"pp" suffixes.
+# Returns the paths of the files written.
+def write_synthetic_data(data_dir, scale=1, sets=1, date=DEFAULT_DATE, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for set_index in range(sets):
+        set_dir = data_dir if sets == 1 else os.path.join(data_dir, f"SY{set_index}")
+        os.makedirs(set_dir, exist_ok=True)
+        cards = _card_list(rng, BASE_CARDS * scale)
+
+        paths.append(os.path.join(set_dir, f"card-ratings-{date}.csv"))
+        _write_csv(paths[-1], _card_ratings_rows(rng, cards, games=1.0))
+        for code in ARCHETYPE_CODES:
+            paths.append(os.path.join(set_dir, f"card-ratings-{date}({code}).csv"))
+            rows = _card_ratings_rows(rng, cards, games=0.12, archetype=code)
+            _write_csv(paths[-1], rows)
+
+        paths.append(os.path.join(set_dir, f"colors-{date}.csv"))
+        _write_csv(paths[-1], _colors_rows(rng, scale))
+    return paths
+
+
+# Names, colors and rarities of the cards of a set
+def _card_list(rng, count):
+    first = rng.choice(_NAME_WORDS, count)
+    second = rng.choice(_NAME_WORDS, count)
+    names = []
+    for index in range(count):
+        name = f"{first[index]} {second[index]} {index}"
+        if index % 9 == 0:
+            name += f", {_TITLES[index % len(_TITLES)]}"  # Quoted in the file
+        if index % 97 == 0:
+            name = f'"{name}"'  # Quotes doubled in the file
+        names.append(name)
+    colors = rng.choice(_COLORS, count, p=_weights(_COLOR_WEIGHTS))
+    rarities = rng.choice(_RARITIES, count, p=_weights(_RARITY_WEIGHTS))
+    return names, colors, rarities
+
+
+# Rows (header first) of a card ratings file. `games` scales the play counts,
+# archetype files keep only the cards played in the archetype.
+def _card_ratings_rows(rng, cards, games, archetype=None):
+    names, colors, rarities = cards
+    count = len(names)
+    kept = np.ones(count, dtype=bool)
+    if archetype is not None:
+        kept = rng.random(count) >= _ARCHETYPE_MISSING_RATE
+
+    seen = rng.integers(50, 1500, count) * games
+    picked = seen * rng.uniform(0.2, 0.95, count)
+    gp = rng.lognormal(7.5, 1.2, count) * games
+    oh = gp * rng.uniform(0.15, 0.2, count)
+    gd = gp * rng.uniform(0.25, 0.3, count)
+    gih = oh + gd
+    gns = gp - gih
+    gih_wr = rng.normal(56, 4, count)
+    gns_wr = gih_wr - rng.normal(4, 3, count)
+
+    columns = [
+        np.asarray(names, dtype=object),
+        colors,
+        rarities,
+        _counts(seen),
+        _decimals(rng.uniform(1, 10, count), 2),
+        _counts(picked),
+        _decimals(rng.uniform(1, 10, count), 2),
+        _counts(gp),
+        _suffixed(rng, rng.uniform(20, 95, count), "%", blanks=False),
+        _suffixed(rng, rng.normal(55, 3, count), "%"),
+        _counts(oh),
+        _suffixed(rng, gih_wr + rng.normal(1, 2, count), "%"),
+        _counts(gd),
+        _suffixed(rng, gih_wr - rng.normal(1, 2, count), "%"),
+        _counts(gih),
+        _suffixed(rng, gih_wr, "%"),
+        _counts(gns),
+        _suffixed(rng, gns_wr, "%"),
+        _suffixed(rng, gih_wr - gns_wr, "pp", decimals=1),
+    ]
+    rows = [CARD_RATINGS_COLUMNS]
+    rows += [row for row, keep in zip(zip(*columns), kept) if keep]
+    return rows
+
+
+# Rows (header first) of a colors file: the deck groups and the archetypes
+def _colors_rows(rng, scale):
+    names = ["Mono-color", "Two-color"]
+    names += list(ARCHETYPE_NAMES.values())
+    names += [f"{name} + Splash" for name in ARCHETYPE_NAMES.values()]
+    names += ["Three-color", "Four-color", "Five-color", "All Decks"]
+    count = len(names)
+    played = rng.integers(2000, 40000, count) * scale
+    win_rates = rng.normal(55, 2.5, count)
+    wins = np.round(played * win_rates / 100)
+    rows = [["Color", "Wins", "# Games", "Win Rate"]]
+    rows += zip(
+        names,
+        _counts(wins),
+        _counts(played),
+        _suffixed(rng, win_rates, "%", blanks=False),
+    )
+    return rows
+
+
+def _counts(values):
+    return np.round(values).astype(np.int64).astype(str)
+
+
+def _decimals(values, decimals):
+    return np.char.mod(f"%.{decimals}f", values)
+
+
+# Numbers with a suffix ("59.50%", "-1.3pp"), some cells left blank
+def _suffixed(rng, values, suffix, decimals=2, blanks=True):
+    texts = np.char.add(_decimals(values, decimals), suffix)
+    if blanks:
+        texts[rng.random(len(texts)) < _BLANK_RATE] = ""
+    return texts
+
+
+def _weights(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights / weights.sum()
+
+
+# Write rows like the 17lands exports (BOM, quotes only where needed)
+def _write_csv(file_path, rows):
+    with open(file_path, "w", encoding="utf-8-sig", newline="") as csv_file:
+        csv.writer(csv_file).writerows(rows)
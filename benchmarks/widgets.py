@@ -0,0 +1,110 @@
+import itertools
+import os
+
+
+#######################################################
+# TREEVIEW FOR THE BENCHMARKS (REAL TK OR STUB)
+#######################################################
+
+# Rows shown by the benchmark table (height of the Treeview)
+TABLE_HEIGHT = 25
+
+# Width in pixels of one character for the stub font
+STUB_CHAR_WIDTH = 7
+
+
+# Function to create a Treeview, a scrollbar and a font for the table
+# benchmarks. With `mode` "real" (or "auto" when there is a display, e.g.
+# under xvfb-run) they are Tk widgets in a hidden window, otherwise stubs
+# keeping the items in memory, so the table code runs without a display.
+# Returns (tree, scrollbar, font, mode used, close function).
+def create_table_widgets(headings, mode="auto"):
+    if mode == "auto":
+        mode = "real" if os.environ.get("DISPLAY") else "stub"
+
+    if mode == "stub":
+        return StubTree(headings), StubScrollbar(), StubFont(), mode, lambda: None
+
+    import tkinter as tk
+    from tkinter import ttk
+    from tkinter.font import Font
+
+    root = tk.Tk()
+    root.withdraw()
+    tree = ttk.Treeview(root, columns=headings, show="headings", height=TABLE_HEIGHT)
+    scrollbar = ttk.Scrollbar(root, orient="vertical")
+    font = Font(root=root, font=ttk.Style(root).lookup("Treeview", "font"))
+
+    # Pending Tk work is done before the timer stops
+    def close():
+        root.update_idletasks()
+        root.destroy()
+
+    return tree, scrollbar, font, mode, close
+
+
+# The part of ttk.Treeview used by TableView, with the items kept in a dict
+class StubTree:
+    def __init__(self, headings, height=TABLE_HEIGHT):
+        self.headings = {heading: {} for heading in headings}
+        self.columns = {heading: {} for heading in headings}
+        self.items = {}  # iid -> values
+        self.height = height
+        self._iids = itertools.count()
+        self._selection = ()
+
+    def cget(self, option):
+        return getattr(self, option)
+
+    def heading(self, heading, **options):
+        self.headings[heading].update(options)
+
+    def column(self, heading, **options):
+        self.columns[heading].update(options)
+
+    def bind(self, sequence, function):
+        pass
+
+    def insert(self, parent, index, values=()):
+        iid = f"I{next(self._iids)}"
+        self.items[iid] = list(values)
+        return iid
+
+    def item(self, iid, values=()):
+        self.items[iid] = list(values)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.items[iid]
+
+    def get_children(self):
+        return list(self.items)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, *iids):
+        self._selection = iids
+
+    def selection_remove(self, *iids):
+        self._selection = ()
+
+    def focus(self):
+        return ""
+
+    def bbox(self, iid):
+        return ""
+
+
+class StubScrollbar:
+    def configure(self, **options):
+        pass
+
+    def set(self, first, last):
+        pass
+
+
+# Font measuring every character with the same width
+class StubFont:
+    def measure(self, text):
+        return STUB_CHAR_WIDTH * len(text)
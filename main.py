@@ -1,10 +1,72 @@
 import tkinter as tk
 from tkinter import ttk
+from tkinter import filedialog
+from tkinter import messagebox
 from tkinter.font import Font
+import argparse
 import pandas as pd
-import math
 import os
 
+from mtgaseer.analysis import DIFFERENCE_STATS, biggest_differences
+from mtgaseer.arena_log import (
+    EVENT_DRAFT_PACK,
+    EVENT_DRAFT_PICK,
+    EVENT_LOGIN,
+    PlayerLogReader,
+)
+from mtgaseer.cleaning import (
+    format_rank,
+    format_trend,
+    format_value,
+    format_win_rate,
+    read_card_ratings,
+)
+from mtgaseer.background_tasks import BackgroundTasks
+from mtgaseer.card_registry import CardRegistry
+from mtgaseer.catalog import DataCatalog, snapshot_label
+from mtgaseer.column_widths import ColumnWidthCache
+from mtgaseer.datasets import ARCHETYPE_NAMES, create_dataset_store, select_snapshot
+from mtgaseer.draft_assistant import (
+    DRAFT_STATS,
+    build_stat_map,
+    rank_pack,
+    read_card_ids,
+)
+from mtgaseer.estimates import DEFAULT_PRIOR_GAMES, estimate_columns, with_estimates
+from mtgaseer.filters import COLOR_SYMBOLS, RANGE_STATS, RARITY_CODES, CardFilter
+from mtgaseer.ingest import (
+    DEFAULT_INGEST_WORKERS,
+    parse_files,
+    snapshot_jobs,
+    store_snapshot,
+)
+from mtgaseer.perf import PERF_FILE_ENV_VAR, SUMMARY_COLUMNS, recorder, span, timed
+from mtgaseer.ranking import DEFAULT_MIN_GIH, CardRanking, rank_column, with_ranks
+from mtgaseer.search_index import NameIndex
+from mtgaseer.search_scheduler import SearchScheduler
+from mtgaseer.synergy import SYNERGY_COLUMNS, SynergyMatrix
+from mtgaseer.table_view import TableView
+from mtgaseer.time_series import open_time_series
+
+
+#######################################################
+# COMMAND LINE OPTIONS
+#######################################################
+
+# Hot path timings are collected when MTGASEER_PERF is set, when a perf file is
+# given (--perf-file or MTGASEER_PERF_FILE) or once the diagnostics tab is
+# opened (Ctrl+Shift+D); the perf file is written when the window is closed
+argument_parser = argparse.ArgumentParser(description="MTGA Seer")
+argument_parser.add_argument(
+    "--perf-file",
+    default=os.environ.get(PERF_FILE_ENV_VAR),
+    help="write the hot path timings to this JSON file on exit",
+)
+arguments, _ = argument_parser.parse_known_args()
+perf_file = arguments.perf_file
+if perf_file:
+    recorder.enabled = True
+
 
 #######################################################
 # DATA LOADING AND PREPARATION
@@ -15,74 +77,116 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # Navigate up one level ('..') and then to the 'data' directory
 data_dir = os.path.join(current_dir, "data")
 
-# Load your data
+# Find the 17lands exports (sets and dates) of the data folder, the newest
+# one is shown first
+catalog = DataCatalog(data_dir)
+current_snapshot = catalog.latest()
+if current_snapshot is None:
+    raise SystemExit(f"No 17lands card ratings files found in {data_dir}")
 
-file_path = os.path.join(data_dir, "card-ratings-2023-11-20.csv")
-mtg_data = pd.read_csv(file_path)
-file_path_colors = os.path.join(data_dir, "colors-2023-11-20.csv")
-mtg_data_colors = pd.read_csv(file_path_colors)
 
-# Load the color stats data
-color_stats_df = pd.read_csv(file_path_colors)
+# Function to set the color stats data of a snapshot (None when the snapshot
+# has no colors file)
+def set_color_stats(colors):
+    global mtg_data_colors, color_stats_df, overall_win_rate, color_win_rates
+    if colors is None:
+        mtg_data_colors = pd.DataFrame(columns=["Color", "Win Rate"])
+    else:
+        mtg_data_colors = colors
+    color_stats_df = mtg_data_colors
 
-# Extract overall win rate and create a dictionary for color win rates
-overall_win_rate = color_stats_df[color_stats_df["Color"] == "All Decks"][
-    "Win Rate"
-].values[0]
-# Create a dictionary to map color combinations to their win rates
-color_win_rates = color_stats_df.set_index("Color")["Win Rate"].to_dict()
+    # Extract overall win rate (missing without a colors file)
+    all_decks = color_stats_df[color_stats_df["Color"] == "All Decks"]["Win Rate"]
+    overall_win_rate = all_decks.values[0] if len(all_decks) else float("nan")
+    # Create a dictionary to map color combinations to their win rates
+    color_win_rates = color_stats_df.set_index("Color")["Win Rate"].to_dict()
 
 
 #######################################################
-# DATA CLEANING AND PROCESSING
+# DATASET STORE (PARSED ONCE, KEYED BY ARCHETYPE)
 #######################################################
 
-# Define columns with percentage values and clean them
-percentage_columns = ["GNS WR", "GIH WR", "GD WR", "OH WR", "GP WR", "% GP"]
-for col in percentage_columns:
-    mtg_data[col] = (
-        mtg_data[col]
-        .str.strip()  # Remove leading/trailing white spaces
-        .replace("%", "", regex=True)  # Remove '%' sign
-        .replace("", 0)  # Replace empty strings with 0 or use np.nan
-        .astype(float)  # Convert to float
+# The overall file is stored under the None key, archetypes under their code.
+# Nothing is parsed yet: the files are loaded in the background once the
+# window is shown (see the data snapshot section at the end).
+dataset_store = create_dataset_store(catalog, current_snapshot)
+set_color_stats(None)
+
+
+#######################################################
+# GIH WR TREND (TIME SERIES OF THE SNAPSHOTS OF A SET)
+#######################################################
+
+# Number of days over which the GIH WR change is shown
+trend_window_days = 14
+trend_column = "GIH WR Trend"
+
+
+# Function to add the exports of a set not seen yet to its time series (only
+# new or changed files are parsed, straight from the CSV: older exports are
+# read once, so they are not put in the columnar cache), returns the number of
+# files added
+def update_trend_store(store, set_code):
+    try:
+        return store.update(catalog, set_code, read_card_ratings)
+    except OSError as error:
+        print(f"Could not update the time series: {error}")
+        return 0
+
+
+# Time series of the set shown, brought up to date in the background once the
+# snapshot is shown
+trend_store = open_time_series(catalog, current_snapshot.set_code)
+
+
+# Function to add the GIH WR change over the trend window to a dataset
+def with_trend(data, key):
+    trend = trend_store.trend(
+        "GIH WR", key, current_snapshot.date, window_days=trend_window_days
     )
+    return data.assign(**{trend_column: trend.reindex(data["Name"]).to_numpy()})
+
+
+#######################################################
+# FIXED CARD RANKING (GIH WR RANK WITHIN THE ARCHETYPE)
+#######################################################
+
+# Cards played in hand fewer times than this are not ranked (changed live
+# from the card tab)
+rank_min_gih = DEFAULT_MIN_GIH
+gih_rank_column = rank_column("GIH WR")
+
+
+# Function to get the ranks of a dataset, computed once per loaded file and
+# threshold
+def get_card_ranking(key):
+    min_gih = rank_min_gih
+    return dataset_store.derived(
+        key,
+        f"card_ranking-{min_gih}",
+        lambda data: CardRanking(data, min_gih=min_gih),
+    )
+
+
+#######################################################
+# SAMPLE-SIZE AWARE GIH WR (SHRUNK WIN RATE AND INTERVAL)
+#######################################################
+
+# Games at the archetype average added to every card (changed live from the
+# card tab); the interval is the 95% Wilson interval
+estimate_prior_games = DEFAULT_PRIOR_GAMES
+gih_estimate_columns = estimate_columns("GIH WR")
+
+
+# Function to get a dataset with the columns added for the card table
+@timed("dataset.prepare")
+def get_shown_data(key):
+    data = with_ranks(dataset_store.get(key), get_card_ranking(key))
+    data = with_estimates(data, "GIH WR", estimate_prior_games)
+    return with_trend(data, key)
 
-# Clean and convert the IWD column
-mtg_data["IWD"] = (
-    mtg_data["IWD"]
-    .str.strip()  # Remove leading/trailing white spaces
-    .replace(
-        {"pp": "", "[^0-9.-]": ""}, regex=True
-    )  # Remove 'pp' and any other non-numeric characters
-    .replace("", 0)  # Replace empty strings with 0 or use np.nan
-    .astype(float)  # Convert to float
-)
-
-# Define columns for NaN replacement and replace NaN values
-nan_replacement_columns = [
-    "ALSA",
-    "# Picked",
-    "ATA",
-    "# GP",
-    "% GP",
-    "GP WR",
-    "# OH",
-    "OH WR",
-    "# GD",
-    "GD WR",
-    "# GIH",
-    "GIH WR",
-    "# GNS",
-    "GNS WR",
-    "IWD",
-]
-for col in nan_replacement_columns:
-    mtg_data[col] = mtg_data[col].fillna("-")
 
-# Clean 'Color' and 'Rarity' columns for leading/trailing spaces and missing values
-for col in ["Color", "Rarity"]:
-    mtg_data[col] = mtg_data[col].str.strip().replace("", "-").fillna("-")
+mtg_data_key = None  # Key of the dataset currently shown
 
 
 #######################################################
@@ -103,6 +207,10 @@ style.theme_use("clam")  # or 'default', 'classic', 'alt', etc.
 style.configure("TNotebook.Tab", borderwidth=2, relief="raised")
 # Apply the modified style to the Notebook
 
+# Frame for the data snapshot selection, above the tabs (filled further down)
+snapshot_frame = ttk.Frame(root)
+snapshot_frame.pack(pady=(10, 0))
+
 # notebook = ttk.Notebook(root, style="TNotebook") TODO: DELETE
 # Create the Notebook widget for tab organization
 notebook = ttk.Notebook(root)
@@ -111,10 +219,20 @@ notebook.pack(pady=10, expand=True, fill="both")
 # Create the frames for each tab
 tab1 = ttk.Frame(notebook)  # Tab for the Card Details Information
 tab2 = ttk.Frame(notebook)  # Tab for the two-color win rates
+tab3 = ttk.Frame(notebook)  # Tab for the live draft assistant
+tab4 = ttk.Frame(notebook)  # Tab for the biggest archetype differences
+tab5 = ttk.Frame(notebook)  # Tab for the best partners of a card
+perf_tab = ttk.Frame(notebook)  # Hidden tab for the hot path timings
 
 # Add the tabs to the notebook
 notebook.add(tab1, text="Card Information")
 notebook.add(tab2, text="Two-Color Win Rates")
+notebook.add(tab3, text="Draft Assistant")
+notebook.add(tab4, text="Archetype Differences")
+notebook.add(tab5, text="Card Synergy")
+# Next to "Two-Color Win Rates", hidden until opened with Ctrl+Shift+D
+notebook.insert(2, perf_tab, text="Diagnostics")
+notebook.hide(perf_tab)
 
 
 #######################################################
@@ -122,128 +240,73 @@ notebook.add(tab2, text="Two-Color Win Rates")
 #######################################################
 
 
-# Function to dynamically search and filter data
-def dynamic_search(event):
-    search_query = search_var.get()
-    filter_data(search_query)
+# Time to wait after the last keystroke before searching (milliseconds)
+search_debounce_ms = 150
 
 
-# Function to filter data based on search query
-def filter_data(search_query):
-    filtered_data = mtg_data[
-        mtg_data["Name"].str.contains(search_query, case=False, na=False)
-    ]
-    update_table(filtered_data)
+# Function to prepare a search on the shown dataset, the returned function
+# runs in the search worker thread
+def prepare_search(search_query):
+    data, search_index, card_filter = mtg_data, mtg_search_index, mtg_card_filter
+    conditions = get_filter_conditions()
 
+    # Name matches, then the color, rarity and range masks (row positions only,
+    # no DataFrame is built until the table shows the rows)
+    def search():
+        with span("search"):
+            rows = card_filter.apply(search_index.search(search_query), **conditions)
+        return data, rows
 
-#######################################################
-# DATA TABLE (TREEVIEW) SETUP AND FUNCTIONS
-#######################################################
+    return search
 
 
-# Function to update the table with filtered data
-def update_table(data):
-    for i in tree.get_children():
-        tree.delete(i)
-    for index, row in data.iterrows():
-        tree.insert(
-            "",
-            tk.END,
-            values=(
-                row["Name"],
-                row["ALSA"],
-                row["Color"],
-                row["Rarity"],
-                row["% GP"],
-                row["GIH WR"],
-                row["IWD"],
-            ),
-        )
-    auto_resize_columns(tree, padding=10)
-
-
-# Automatically adjust column widths
-def auto_resize_columns(treeview, padding=10):
-    for column in treeview["columns"]:
-        header_width = Font().measure(column.title())
-        max_width = header_width
-        for row in treeview.get_children():
-            cell_value = treeview.set(row, column)
-            cell_width = Font().measure(cell_value)
-            if cell_width > max_width:
-                max_width = cell_width
-        treeview.column(column, width=max_width + padding)
-
-
-# Function to update column header with sort indicator
-def update_sort_column_header(tv, col, reverse):
-    global current_sort_column, current_sort_order
-    for c in tv["columns"]:
-        if c == col:
-            # Add an arrow symbol to the current sorted column
-            arrow = "↑" if reverse else "↓"
-            tv.heading(c, text=f"{c} {arrow}")
-        else:
-            # Remove arrow symbol from other columns
-            tv.heading(c, text=c)
-    current_sort_column = col
-    current_sort_order = reverse
-
-
-# Function to sort the table considering NaN, hyphens, and non-numeric values
-def treeview_sort_column(tv, col, reverse):
-    l = [(tv.set(k, col), k) for k in tv.get_children("")]
-
-    # Custom sorting function
-    def custom_sort(tup):
-        val, _ = tup
-
-        # Check for hyphen or empty values, treat them as 'last' in sorting always
-        if val == "-" or val == "" or val is None:
-            return (2, math.inf)
-
-        # Try converting to float for numeric sorting
-        try:
-            numeric_val = float(val)
-            return (0, -numeric_val if reverse else numeric_val)
-        except ValueError:
-            # Non-numeric values get sorted as strings (case-insensitive)
-            return (1, val.lower() if isinstance(val, str) else val)
+# Function to show a search result, ignored if the dataset changed meanwhile
+def apply_search(result):
+    data, rows = result
+    if data is card_table.data:
+        card_table.show(rows)
 
-    # Sort using the custom function
-    l.sort(
-        key=custom_sort, reverse=False
-    )  # Always sort in ascending order based on custom_sort logic
 
-    # Rearrange the items in the treeview
-    for index, (_, k) in enumerate(l):
-        tv.move(k, "", index)
+# Debounced searches, filtered off the Tk main thread
+search_scheduler = SearchScheduler(
+    root, prepare_search, apply_search, delay_ms=search_debounce_ms
+)
 
-    # Change the sort order for the next time
-    tv.heading(col, command=lambda: treeview_sort_column(tv, col, not reverse))
 
-    update_sort_column_header(tv, col, reverse)
+# Function to dynamically search and filter data (called when the text changes)
+def dynamic_search(*args):
+    search_scheduler.schedule(search_var.get())
 
 
-# Function for sorting alphabetically ('Color', 'Rarity', 'Name')
-def treeview_sort_column_alphabetic(tv, col, reverse):
-    l = [(tv.set(k, col), k) for k in tv.get_children("")]
+# Function to filter data based on search query right away (plain text, not a
+# regex), dropping any search still pending
+def filter_data(search_query):
+    search_scheduler.cancel()
+    apply_search(prepare_search(search_query)())
 
-    def custom_sort(tup):
-        val, _ = tup
-        if val == "-" or val == "" or val is None:
-            return (1, math.inf)
-        return (0, val.lower() if isinstance(val, str) else val)
 
-    l.sort(key=custom_sort, reverse=reverse)
-    for index, (_, k) in enumerate(l):
-        tv.move(k, "", index)
+#######################################################
+# DATA TABLE (TREEVIEW) SETUP AND FUNCTIONS
+#######################################################
 
-    tv.heading(
-        col, command=lambda: treeview_sort_column_alphabetic(tv, col, not reverse)
-    )
 
-    update_sort_column_header(tv, col, reverse)
+# Data columns shown in the card table, in the same order as its headings
+table_data_columns = [gih_rank_column, "Name", "ALSA", "Color", "Rarity", "% GP"]
+table_data_columns += ["GIH WR", gih_estimate_columns["shrunk"]]
+table_data_columns += [gih_estimate_columns["low"], "IWD"]
+table_data_columns += [trend_column]
+
+# Shown dataset, its name search index, its card filter and its draft stats
+# (empty until the first snapshot is loaded)
+mtg_data = pd.DataFrame(columns=table_data_columns)
+mtg_search_index = NameIndex.from_data(mtg_data)
+mtg_card_filter = CardFilter.from_data(mtg_data)
+mtg_draft_stat_map = {}
+
+
+# Function to update the table with a new dataset (sorting is kept)
+def update_table(data):
+    card_table.set_data(data)
 
 
 #######################################################
@@ -258,6 +321,14 @@ search_frame.pack(pady=10)
 color_selection_frame = ttk.Frame(tab1)
 color_selection_frame.pack(pady=10)
 
+# Frame for the color, rarity and stat range filters
+filter_frame = ttk.Frame(tab1)
+filter_frame.pack(pady=(0, 10))
+
+# Frame for the win rate estimate settings
+estimate_frame = ttk.Frame(tab1)
+estimate_frame.pack(pady=(0, 10))
+
 
 #######################################################
 # GUI SETUP - COLOR SELECTION WIDGETS
@@ -299,18 +370,7 @@ color_combinations = {
 }
 
 # Mapping from simple codes to full names
-color_code_to_name = {
-    "WU": "Azorius (WU)",
-    "WB": "Orzhov (WB)",
-    "WR": "Boros (RW)",
-    "WG": "Selesnya (GW)",
-    "UB": "Dimir (UB)",
-    "UR": "Izzet (UR)",
-    "UG": "Simic (GU)",
-    "BR": "Rakdos (BR)",
-    "BG": "Golgari (BG)",
-    "RG": "Gruul (RG)",
-}
+color_code_to_name = ARCHETYPE_NAMES
 
 # Add some horizontal space between the two elements
 spacer_label = tk.Label(color_selection_frame, text="", width=2, background="#dcdad5")
@@ -354,7 +414,8 @@ search_label.pack(side=tk.LEFT, padx=(0, 10))  # Add some padding for spacing
 search_var = tk.StringVar()
 search_entry = tk.Entry(search_frame, textvariable=search_var, font=("Helvetica", 10))
 search_entry.pack(side=tk.LEFT)
-search_entry.bind("<KeyRelease>", dynamic_search)
+# Search only when the text changes (not on arrow, shift, ... keys)
+search_var.trace_add("write", dynamic_search)
 
 # Add title label for displaying the stats
 title_label = tk.Label(
@@ -366,6 +427,205 @@ title_label = tk.Label(
 title_label.pack(pady=(5, 10))  # Adjust padding as needed
 
 
+#######################################################
+# GUI SETUP - WIN RATE ESTIMATE SETTINGS
+#######################################################
+
+# Time to wait after the last change of a setting before recomputing
+estimate_debounce_ms = 300
+estimate_after = None  # Pending recompute
+
+prior_games_label = tk.Label(
+    estimate_frame,
+    text="Prior (games):",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+prior_games_label.pack(side=tk.LEFT, padx=(0, 10))
+
+prior_games_var = tk.IntVar(value=estimate_prior_games)
+prior_games_spinbox = ttk.Spinbox(
+    estimate_frame,
+    from_=0,
+    to=5000,
+    increment=50,
+    width=6,
+    textvariable=prior_games_var,
+)
+prior_games_spinbox.pack(side=tk.LEFT)
+
+min_gih_label = tk.Label(
+    estimate_frame,
+    text="Min. # GIH to Rank:",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+min_gih_label.pack(side=tk.LEFT, padx=(20, 10))
+
+min_gih_var = tk.IntVar(value=rank_min_gih)
+min_gih_spinbox = ttk.Spinbox(
+    estimate_frame,
+    from_=0,
+    to=100000,
+    increment=100,
+    width=7,
+    textvariable=min_gih_var,
+)
+min_gih_spinbox.pack(side=tk.LEFT)
+
+
+# Function to recompute the ranks and the estimates of the shown dataset with
+# the new settings (vectorized, so it keeps up with the spinboxes)
+def apply_estimate_settings():
+    global estimate_after, estimate_prior_games, rank_min_gih
+    estimate_after = None
+    try:
+        settings = (max(prior_games_var.get(), 0), max(min_gih_var.get(), 0))
+    except tk.TclError:
+        return  # Not a number (yet), keep the current settings
+    if settings == (estimate_prior_games, rank_min_gih):
+        return
+    if settings[1] != rank_min_gih:
+        # Only the ranks of the current threshold are kept
+        dataset_store.drop_derived(f"card_ranking-{rank_min_gih}")
+        dataset_store.drop_derived(f"draft_stat_map-{rank_min_gih}")
+    estimate_prior_games, rank_min_gih = settings
+
+    # While loading, the new settings are used once the snapshot is loaded
+    if not background_tasks.busy() and mtg_data_key in dataset_store:
+        load_data_from_file(mtg_data_key)
+        filter_data(search_var.get())
+
+
+# Function to recompute once the user stops changing a setting
+def on_estimate_setting_changed(*args):
+    global estimate_after
+    if estimate_after is not None:
+        root.after_cancel(estimate_after)
+    estimate_after = root.after(estimate_debounce_ms, apply_estimate_settings)
+
+
+prior_games_var.trace_add("write", on_estimate_setting_changed)
+min_gih_var.trace_add("write", on_estimate_setting_changed)
+
+
+#######################################################
+# GUI SETUP - CARD FILTER WIDGETS
+#######################################################
+
+# Color and rarity check buttons, nothing checked means no filter
+filter_color_vars = {symbol: tk.BooleanVar(value=False) for symbol in COLOR_SYMBOLS}
+filter_rarity_names = {
+    "C": "Common",
+    "U": "Uncommon",
+    "R": "Rare",
+    "M": "Mythic",
+    "B": "Bonus",
+}
+filter_rarity_vars = {code: tk.BooleanVar(value=False) for code in RARITY_CODES}
+
+# Stat ranges (stat, min, max), an empty bound is open
+filter_range_defaults = ["GIH WR", "# GIH"]
+filter_range_vars = [
+    (tk.StringVar(value=stat), tk.StringVar(), tk.StringVar())
+    for stat in filter_range_defaults
+]
+
+# How the checked colors are matched (see COLOR_MATCHES)
+filter_color_match_names = {
+    "Any Checked Color": "any",
+    "Only Checked Colors": "within",
+}
+filter_color_match_var = tk.StringVar(value="Any Checked Color")
+
+
+# Function to refilter once the user stops changing the filters (the same
+# debounced background search as typing a name)
+def on_filter_changed(*args):
+    dynamic_search()
+
+
+# Function to read a range bound (None when empty or not a number)
+def get_filter_bound(var):
+    try:
+        return float(var.get().replace(",", "."))
+    except ValueError:
+        return None
+
+
+# Function to get the filter conditions set in the widgets, as CardFilter.mask
+# arguments
+def get_filter_conditions():
+    colors = [symbol for symbol, var in filter_color_vars.items() if var.get()]
+    rarities = [code for code, var in filter_rarity_vars.items() if var.get()]
+    ranges = []
+    for stat_var, low_var, high_var in filter_range_vars:
+        low, high = get_filter_bound(low_var), get_filter_bound(high_var)
+        if low is not None or high is not None:
+            ranges.append((stat_var.get(), low, high))
+    return {
+        "colors": colors or None,
+        "rarities": rarities or None,
+        "ranges": ranges,
+        "color_match": filter_color_match_names[filter_color_match_var.get()],
+    }
+
+
+filter_colors_label = tk.Label(
+    filter_frame, text="Colors:", font=("Helvetica", 12), background="#dcdad5"
+)
+filter_colors_label.grid(row=0, column=0, sticky="w", padx=(0, 10))
+for column, (symbol, var) in enumerate(filter_color_vars.items(), 1):
+    ttk.Checkbutton(
+        filter_frame, text=symbol, variable=var, command=on_filter_changed
+    ).grid(row=0, column=column, sticky="w")
+
+filter_color_match_combobox = ttk.Combobox(
+    filter_frame,
+    textvariable=filter_color_match_var,
+    values=list(filter_color_match_names),
+    state="readonly",
+    width=18,
+)
+filter_color_match_combobox.grid(row=0, column=len(COLOR_SYMBOLS) + 1, padx=(10, 0))
+filter_color_match_combobox.bind("<<ComboboxSelected>>", on_filter_changed)
+
+filter_rarity_label = tk.Label(
+    filter_frame, text="Rarity:", font=("Helvetica", 12), background="#dcdad5"
+)
+filter_rarity_label.grid(row=1, column=0, sticky="w", padx=(0, 10))
+for column, (code, var) in enumerate(filter_rarity_vars.items(), 1):
+    ttk.Checkbutton(
+        filter_frame,
+        text=filter_rarity_names[code],
+        variable=var,
+        command=on_filter_changed,
+    ).grid(row=1, column=column, sticky="w")
+
+# One row per stat range: stat, min and max
+for row, (stat_var, low_var, high_var) in enumerate(filter_range_vars, 2):
+    tk.Label(
+        filter_frame, text="Range:", font=("Helvetica", 12), background="#dcdad5"
+    ).grid(row=row, column=0, sticky="w", padx=(0, 10))
+    stat_combobox = ttk.Combobox(
+        filter_frame,
+        textvariable=stat_var,
+        values=RANGE_STATS,
+        state="readonly",
+        width=8,
+    )
+    stat_combobox.grid(row=row, column=1, columnspan=2, sticky="w")
+    stat_combobox.bind("<<ComboboxSelected>>", on_filter_changed)
+    for column, (text, var) in enumerate([("Min", low_var), ("Max", high_var)]):
+        tk.Label(filter_frame, text=text, background="#dcdad5").grid(
+            row=row, column=3 + 2 * column, sticky="e", padx=(10, 5)
+        )
+        tk.Entry(filter_frame, textvariable=var, width=7).grid(
+            row=row, column=4 + 2 * column, sticky="w"
+        )
+        var.trace_add("write", on_filter_changed)
+
+
 #######################################################
 # COLOR SELECTION AND DATA FILTERING
 #######################################################
@@ -376,63 +636,49 @@ def update_title(selected_color_code=None):
     selected_color_name = color_code_to_name.get(selected_color_code, None)
     if selected_color_name and selected_color_name in color_win_rates:
         win_rate = color_win_rates[selected_color_name]
-        title_text = f"{selected_color_name} - Avg. Win Rate: {win_rate}"
+        title_text = (
+            f"{selected_color_name} - Avg. Win Rate: {format_win_rate(win_rate)}"
+        )
     else:
-        title_text = f"Overall - Avg. Win Rate: {overall_win_rate}"
+        title_text = f"Overall - Avg. Win Rate: {format_win_rate(overall_win_rate)}"
     title_label.config(text=title_text)
 
 
-# Function for loading data from a file
-def load_data_from_file(file_path):
-    global mtg_data
+# Function for loading data from the dataset store (parsed only once per file)
+@timed("dataset.switch")
+def load_data_from_file(key):
+    global mtg_data, mtg_data_key, mtg_search_index, mtg_card_filter
+    global mtg_draft_stat_map
+    if key not in dataset_store:
+        message = f"No {key} card ratings for {snapshot_label(current_snapshot)}"
+        print(message)
+        messagebox.showerror("Error", message)
+        return
     try:
-        mtg_data = pd.read_csv(file_path)
-
-        # Repeat the same cleaning and processing as for the general file
-        # Clean percentage columns
-        for col in percentage_columns:
-            mtg_data[col] = (
-                mtg_data[col]
-                .str.strip()  # Remove leading/trailing white spaces
-                .replace("%", "", regex=True)  # Remove '%' sign
-                .replace("", 0)  # Replace empty strings with 0 or use np.nan
-                .astype(float)  # Convert to float
-            )
-
-        # Clean and convert the IWD column
-        mtg_data["IWD"] = (
-            mtg_data["IWD"]
-            .str.strip()  # Remove leading/trailing white spaces
-            .replace(
-                {"pp": "", "[^0-9.-]": ""}, regex=True
-            )  # Remove 'pp' and any other non-numeric characters
-            .replace("", 0)  # Replace empty strings with 0 or use np.nan
-            .astype(float)  # Convert to float
+        mtg_data = get_shown_data(key)
+        mtg_data_key = key
+        mtg_search_index = dataset_store.derived(
+            key, "search_index", NameIndex.from_data
         )
-
-        # Replace NaN values in specified columns
-        for col in nan_replacement_columns:
-            mtg_data[col] = mtg_data[col].fillna("-")
-
-        # Clean 'Color' and 'Rarity' columns
-        for col in ["Color", "Rarity"]:
-            mtg_data[col] = mtg_data[
-                col
-            ].str.strip()  # Remove leading/trailing white spaces
-            mtg_data[col] = mtg_data[col].replace(
-                "", "-"
-            )  # Replace empty strings with '-'
-            mtg_data[col] = mtg_data[col].fillna("-")  # Replace NaN values with '-'
+        mtg_card_filter = dataset_store.derived(
+            key, "card_filter", CardFilter.from_data
+        )
+        mtg_draft_stat_map = get_draft_stat_map(key)
 
         # Update the table with the new data
         update_table(mtg_data)
 
+        # Rank the current draft pack again for the new archetype
+        if last_pack_event is not None:
+            show_draft_pack(last_pack_event)
+
     except FileNotFoundError:
+        file_path = dataset_store.path(key)
         print(f"File not found: {file_path}")
         # Optionally, load a default dataset or show an error message
-        tk.messagebox.showerror("Error", f"File not found: {file_path}")
+        messagebox.showerror("Error", f"File not found: {file_path}")
         # Another option would be to use the default dataset to load it here
-        # e.g., load_data_from_file("path_to_default_dataset.csv")
+        # e.g., load_data_from_file(None)
 
 
 # Event handler for color selection
@@ -454,11 +700,9 @@ def on_color_selected(event):
 
     update_title(selected_color)  # Update the title with the selected color's win rate
 
-    combo_file_path = os.path.join(data_dir, "card-ratings-2023-11-20.csv")
-    load_data_from_file(combo_file_path)
-    update_table(mtg_data)
+    load_data_from_file(None)  # Overall data, already in the dataset store
 
-    dynamic_search(None)  # Trigger the search
+    filter_data(search_var.get())  # Trigger the search
 
 
 # Bind the color selection combobox to the event handler
@@ -470,10 +714,7 @@ def on_color_combo_selected(event):
     selected_combo_name = color_code_to_name.get(selected_combo_code, None)
 
     if selected_combo_name:
-        combo_file_path = os.path.join(
-            data_dir, f"card-ratings-2023-11-20({selected_combo_code}).csv"
-        )
-        load_data_from_file(combo_file_path)
+        load_data_from_file(selected_combo_code)
     else:
         print("Data Not Found (Color Combination)")
 
@@ -481,7 +722,7 @@ def on_color_combo_selected(event):
         selected_combo_code
     )  # Update the title with the selected combination's win rate
 
-    update_table(mtg_data)
+    filter_data(search_var.get())  # Apply the search and the filters again
 
 
 # Bind the color combination combobox to the dynamic search (modify as needed)
@@ -498,42 +739,47 @@ tree_frame.pack(pady=20, expand=True, fill="both")
 
 # Treeview setup
 columns = [
+    "Rank",
     "Card Name",
     "Avg. Pick Turn",
     "Color",
     "Rarity",
     "Games Played %",
     "WinRate In Hand (%)",
+    "Shrunk WR In Hand",
+    "WR In Hand (95% Low)",
     " (% WR H - % WR not H)",
+    f"WR In Hand Trend ({trend_window_days}d)",
 ]
 tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
 
-# Set column properties and assign sorting functions with initial sorting order
+# Set column properties
 for col in columns:
-    if col != "Name":
-        tree.column(col, anchor="center")  # Center-align the column contents
-    if col in ["Color", "Rarity", "Name"]:
-        tree.heading(
-            col,
-            text=col,
-            anchor="center",
-            command=lambda c=col: treeview_sort_column_alphabetic(tree, c, False),
-        )
-    else:
-        tree.heading(
-            col,
-            text=col,
-            anchor="center",
-            command=lambda c=col: treeview_sort_column(tree, c, False),
-        )
-
+    tree.column(col, anchor="center")  # Center-align the column contents
 
 # Scrollbar setup
-scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
 scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-tree.configure(yscrollcommand=scrollbar.set)
 tree.pack(side=tk.LEFT, fill="both", expand=True)
 
+# Table view keeping the DataFrame behind the Treeview, headers sort on click.
+# It is windowed: only the visible rows are drawn and the scrollbar moves
+# through the whole dataset.
+card_table = TableView(
+    tree,
+    list(zip(columns, table_data_columns)),
+    formatters={
+        gih_rank_column: format_rank,
+        gih_estimate_columns["shrunk"]: lambda value: format_value("GIH WR", value),
+        gih_estimate_columns["low"]: lambda value: format_value("GIH WR", value),
+        trend_column: format_trend,
+    },
+    scrollbar=scrollbar,
+    virtual=True,
+    # Column widths are measured once per dataset with a single shared font
+    column_widths=ColumnWidthCache(Font(font=style.lookup("Treeview", "font"))),
+)
+
 # Initially displaying all data
 update_table(mtg_data)
 update_title()  # Initialize the title with overall stats
@@ -567,36 +813,669 @@ two_color_combinations = [
     "Boros (RW)",
 ]
 
-# Filter out only the specific two-color combinations
-two_color_data = mtg_data_colors[mtg_data_colors["Color"].isin(two_color_combinations)]
 
-# Extract the relevant columns
-two_color_winrates = two_color_data[["Color", "Win Rate"]].copy()
+# Function to get the two-color win rates of the loaded colors file
+def get_two_color_winrates():
+    # Filter out only the specific two-color combinations
+    two_color_data = mtg_data_colors[
+        mtg_data_colors["Color"].isin(two_color_combinations)
+    ]
+    # Extract the relevant columns
+    return two_color_data[["Color", "Win Rate"]].reset_index(drop=True)
+
 
-# Define the column headings and add the data
+# Set the column properties
 for col in two_color_columns:
-    two_color_tree.heading(
-        col,
-        text=col,
-        anchor="center",
-        command=lambda c=col: treeview_sort_column_alphabetic(two_color_tree, c, False),
-    )
     two_color_tree.column(
         col,
         anchor="center",
         width=100,
     )
 
-# Populate the Treeview with the two-color data
-for index, row in two_color_winrates.iterrows():
-    # Insert the data as is, assuming 'Win Rate' is already a string like '59.60%'
-    two_color_tree.insert("", "end", values=(row["Color"], row["Win Rate"]))
+# Populate the Treeview with the two-color data ('Win Rate' shown like '59.60%')
+two_color_table = TableView(
+    two_color_tree,
+    list(zip(two_color_columns, ["Color", "Win Rate"])),
+    formatters={"Win Rate": format_win_rate},
+)
+two_color_table.set_data(get_two_color_winrates())
 
 two_color_tree.pack()
 
 
+#######################################################
+# GUI SETUP - DIAGNOSTICS (HOT PATH TIMINGS)
+#######################################################
+
+# How often the timings are refreshed while the tab is shown (milliseconds)
+perf_refresh_ms = 1000
+perf_tab_shown = False
+
+perf_buttons_frame = ttk.Frame(perf_tab)
+perf_buttons_frame.pack(pady=10)
+
+# Treeview with count, p50, p95, max and total time of each operation (filled
+# directly, a TableView would time itself)
+perf_frame = ttk.Frame(perf_tab)
+perf_frame.pack(pady=10, expand=True, fill="both")
+perf_tree = ttk.Treeview(perf_frame, columns=SUMMARY_COLUMNS, show="headings")
+for col in SUMMARY_COLUMNS:
+    perf_tree.heading(col, text=col, anchor="center")
+    perf_tree.column(col, anchor="center")
+perf_tree.pack(expand=True, fill="both")
+
+
+# Function to show the current timings, slowest in total first
+def show_perf_summary():
+    perf_tree.delete(*perf_tree.get_children())
+    for row in recorder.summary():
+        values = [row[0], row[1]] + [f"{value:.2f}" for value in row[2:]]
+        perf_tree.insert("", "end", values=values)
+
+
+# Function to show or hide the diagnostics tab (timings are collected from the
+# first time it is shown)
+def toggle_perf_tab(event=None):
+    global perf_tab_shown
+    perf_tab_shown = not perf_tab_shown
+    if perf_tab_shown:
+        recorder.enabled = True
+        notebook.add(perf_tab)  # Shown again at its place
+        notebook.select(perf_tab)
+        show_perf_summary()
+    else:
+        notebook.hide(perf_tab)
+
+
+def reset_perf_summary():
+    recorder.reset()
+    show_perf_summary()
+
+
+# Function to save the timings to a JSON file chosen by the user
+def save_perf_summary():
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".json", initialfile="mtgaseer-perf.json"
+    )
+    if file_path:
+        try:
+            recorder.dump(file_path)
+        except OSError as error:
+            messagebox.showerror("Error", f"Could not save the timings: {error}")
+
+
+# Function to refresh the timings while the tab is the selected one
+def poll_perf_summary():
+    if perf_tab_shown and notebook.select() == str(perf_tab):
+        show_perf_summary()
+    root.after(perf_refresh_ms, poll_perf_summary)
+
+
+perf_reset_button = ttk.Button(
+    perf_buttons_frame, text="Reset", command=reset_perf_summary
+)
+perf_reset_button.pack(side=tk.LEFT, padx=5)
+perf_save_button = ttk.Button(
+    perf_buttons_frame, text="Save...", command=save_perf_summary
+)
+perf_save_button.pack(side=tk.LEFT, padx=5)
+
+root.bind_all("<Control-Shift-D>", toggle_perf_tab)
+if recorder.enabled:
+    toggle_perf_tab()
+root.after(perf_refresh_ms, poll_perf_summary)
+
+
+#######################################################
+# GUI SETUP - DRAFT ASSISTANT (LIVE PLAYER.LOG PACKS)
+#######################################################
+
+# How often Player.log is checked for new lines (milliseconds)
+player_log_poll_ms = 500
+
+# MTG Arena card ids (used in Player.log) -> card names, from the optional
+# 17lands "cards.csv" export placed in the data folder
+card_ids_path = os.path.join(data_dir, "cards.csv")
+arena_card_ids = read_card_ids(card_ids_path) if os.path.exists(card_ids_path) else {}
+
+# Player.log location, can be changed with the MTGASEER_PLAYER_LOG variable
+player_log_reader = PlayerLogReader(os.environ.get("MTGASEER_PLAYER_LOG"))
+last_pack_event = None  # Last pack seen, ranked again on archetype changes
+pending_pack_event = None  # Last pack read, shown once the log is caught up
+
+
+# Function to get the {card id: stats} map of a dataset, built only once
+def get_draft_stat_map(key):
+    return dataset_store.derived(
+        key,
+        f"draft_stat_map-{rank_min_gih}",
+        lambda data: build_stat_map(
+            with_ranks(data, get_card_ranking(key)), arena_card_ids
+        ),
+    )
+
+
+# Function to precompute the maps of every archetype of the snapshot, so a
+# new pack is only dict lookups
+def precompute_draft_stat_maps():
+    for key in dataset_store.keys():
+        try:
+            get_draft_stat_map(key)
+        except FileNotFoundError:
+            pass
+
+
+# Labels for the log status and the current pack
+draft_status_label = tk.Label(
+    tab3,
+    text=f"Reading: {player_log_reader.file_path}",
+    font=("Helvetica", 10),
+    background="#dcdad5",
+)
+draft_status_label.pack(pady=(10, 0))
+
+draft_pack_label = tk.Label(
+    tab3,
+    text="Waiting for a draft pack...",
+    font=("Helvetica", 12, "bold"),
+    background="#dcdad5",
+)
+draft_pack_label.pack(pady=(5, 10))
+
+# Treeview with the cards of the current pack, best first
+draft_frame = ttk.Frame(tab3)
+draft_frame.pack(pady=10, expand=True, fill="both")
+
+draft_columns = ["Card Name", "WinRate In Hand (%)", "Rank", "IWD", "Avg. Pick Turn"]
+draft_tree = ttk.Treeview(draft_frame, columns=draft_columns, show="headings")
+for col in draft_columns:
+    draft_tree.column(col, anchor="center")
+draft_tree.pack(expand=True, fill="both")
+
+draft_table = TableView(
+    draft_tree,
+    list(zip(draft_columns, ["Name"] + DRAFT_STATS)),
+    formatters={gih_rank_column: format_rank},
+)
+
+
+# Function to rank and show the cards of a pack for the selected archetype
+@timed("draft.show_pack")
+def show_draft_pack(event):
+    global last_pack_event
+    last_pack_event = event
+    ranked = rank_pack(mtg_draft_stat_map, event.data["card_ids"])
+    draft_table.set_data(pd.DataFrame(ranked, columns=["Name"] + DRAFT_STATS))
+
+    archetype = color_code_to_name.get(mtg_data_key, "Overall")
+    draft_pack_label.config(
+        text=f"Pack {event.data['pack']} - Pick {event.data['pick']} ({archetype})"
+    )
+
+
+# Function to read the new Player.log lines and react to draft events
+def poll_player_log():
+    global pending_pack_event
+    status_text = None
+    for event in player_log_reader.poll():
+        if event.kind == EVENT_DRAFT_PACK:
+            pending_pack_event = event
+        elif event.kind == EVENT_DRAFT_PICK:
+            picked = [
+                arena_card_ids.get(card_id, f"Card #{card_id}")
+                for card_id in event.data["card_ids"]
+            ]
+            status_text = f"Picked: {', '.join(picked)}"
+        elif event.kind == EVENT_LOGIN:
+            status_text = f"Logged in as {event.data['display_name']}"
+    if status_text is not None:
+        draft_status_label.config(text=status_text)
+
+    # Only the last pack is ranked, once the log is read up to its end: older
+    # packs (the whole log is replayed on start) are never drawn
+    caught_up = player_log_reader.tailer.caught_up
+    if caught_up and pending_pack_event is not None:
+        show_draft_pack(pending_pack_event)
+        pending_pack_event = None
+
+    # Keep reading right away while catching up with a long log
+    delay = player_log_poll_ms if caught_up else 1
+    root.after(delay, poll_player_log)
+
+
+root.after(player_log_poll_ms, poll_player_log)
+
+
+#######################################################
+# GUI SETUP - BIGGEST DIFFERENCES BETWEEN ARCHETYPES
+#######################################################
+
+# Number of cards listed for the selected stat
+difference_top_cards = 50
+
+# Frame and Combobox for the stat to compare
+difference_selection_frame = ttk.Frame(tab4)
+difference_selection_frame.pack(pady=10)
+
+difference_label = tk.Label(
+    difference_selection_frame,
+    text="Compare Stat:",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+difference_label.pack(side=tk.LEFT, padx=(0, 10))
+
+difference_stat_var = tk.StringVar()
+difference_stat_combobox = ttk.Combobox(
+    difference_selection_frame, textvariable=difference_stat_var, state="readonly"
+)
+difference_stat_combobox["values"] = DIFFERENCE_STATS
+difference_stat_combobox.set(DIFFERENCE_STATS[0])
+difference_stat_combobox.pack(side=tk.LEFT)
+
+# Treeview with the cards that change the most between archetypes
+difference_frame = ttk.Frame(tab4)
+difference_frame.pack(pady=10, expand=True, fill="both")
+
+difference_columns = [
+    "Card Name",
+    "Color Combination",
+    "Overall",
+    "In Combination",
+    "Difference",
+]
+difference_tree = ttk.Treeview(
+    difference_frame, columns=difference_columns, show="headings"
+)
+for col in difference_columns:
+    difference_tree.column(col, anchor="center")
+
+difference_scrollbar = ttk.Scrollbar(
+    difference_frame, orient="vertical", command=difference_tree.yview
+)
+difference_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+difference_tree.configure(yscrollcommand=difference_scrollbar.set)
+difference_tree.pack(side=tk.LEFT, expand=True, fill="both")
+
+difference_table = TableView(
+    difference_tree,
+    list(
+        zip(
+            difference_columns,
+            ["Name", "Archetype", "Overall", "Archetype Value", "Difference"],
+        )
+    ),
+)
+
+
+# Card ids shared by every dataset of every snapshot
+card_registry = CardRegistry()
+
+
+# Function to get the stats of a dataset as arrays indexed by card id, built
+# only once per dataset
+def get_card_table(key):
+    return dataset_store.derived(
+        key, "card_table", lambda data: card_registry.table(data, DIFFERENCE_STATS)
+    )
+
+
+# Function to list the biggest differences of the selected stat, computed on
+# the card × archetype matrix of the cached datasets (aligned by card id)
+@timed("differences.show")
+def show_differences(event=None):
+    archetype_tables = {}
+    for code, name in color_code_to_name.items():
+        if code not in dataset_store:
+            continue  # No file for this archetype in the snapshot
+        try:
+            archetype_tables[name] = get_card_table(code)
+        except FileNotFoundError:
+            pass
+    differences = biggest_differences(
+        get_card_table(None),
+        archetype_tables,
+        stats=[difference_stat_var.get()],
+        top=difference_top_cards,
+        registry=card_registry,
+    )
+    difference_table.set_data(differences)
+
+
+difference_stat_combobox.bind("<<ComboboxSelected>>", show_differences)
+
+
+#######################################################
+# GUI SETUP - CARD SYNERGY (BEST PARTNERS OF A CARD)
+#######################################################
+
+# Number of partners listed for the selected card
+synergy_top_cards = 50
+
+# Pair kinds shown in the combobox -> SYNERGY_KINDS
+synergy_kinds = {"Both in Hand (GIH WR)": "GIH", "Both in Deck (GP WR)": "GP"}
+
+# Synergy matrix of the shown snapshot, None when it has no synergy file
+synergy_matrix = None
+
+# Frame with the card and the kind of pairs
+synergy_selection_frame = ttk.Frame(tab5)
+synergy_selection_frame.pack(pady=10)
+
+synergy_card_label = tk.Label(
+    synergy_selection_frame,
+    text="Card:",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+synergy_card_label.pack(side=tk.LEFT, padx=(0, 10))
+
+synergy_card_var = tk.StringVar()
+synergy_card_combobox = ttk.Combobox(
+    synergy_selection_frame, textvariable=synergy_card_var, width=35
+)
+synergy_card_combobox.pack(side=tk.LEFT, padx=(0, 20))
+
+synergy_kind_label = tk.Label(
+    synergy_selection_frame,
+    text="Played Together:",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+synergy_kind_label.pack(side=tk.LEFT, padx=(0, 10))
+
+synergy_kind_var = tk.StringVar()
+synergy_kind_combobox = ttk.Combobox(
+    synergy_selection_frame, textvariable=synergy_kind_var, state="readonly"
+)
+synergy_kind_combobox["values"] = list(synergy_kinds)
+synergy_kind_combobox.set(next(iter(synergy_kinds)))
+synergy_kind_combobox.pack(side=tk.LEFT)
+
+# Shown when the snapshot has no synergy file
+synergy_status_label = tk.Label(tab5, text="", font=("Helvetica", 11))
+synergy_status_label.pack()
+
+# Treeview with the partners of the card, highest lift first
+synergy_frame = ttk.Frame(tab5)
+synergy_frame.pack(pady=10, expand=True, fill="both")
+
+synergy_tree = ttk.Treeview(synergy_frame, columns=SYNERGY_COLUMNS, show="headings")
+for col in SYNERGY_COLUMNS:
+    synergy_tree.column(col, anchor="center")
+
+synergy_scrollbar = ttk.Scrollbar(
+    synergy_frame, orient="vertical", command=synergy_tree.yview
+)
+synergy_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+synergy_tree.configure(yscrollcommand=synergy_scrollbar.set)
+synergy_tree.pack(side=tk.LEFT, expand=True, fill="both")
+
+synergy_table = TableView(
+    synergy_tree,
+    list(zip(SYNERGY_COLUMNS, SYNERGY_COLUMNS)),
+    formatters={"Pair WR": format_win_rate, "Expected WR": format_win_rate},
+)
+
+
+# Function to load the synergy file of a snapshot (None when there is none);
+# runs in the load worker
+def load_synergy(snapshot):
+    synergy_file = catalog.synergy_file(snapshot)
+    if synergy_file is None:
+        return None
+    try:
+        return SynergyMatrix.load(synergy_file)
+    except (OSError, ValueError) as error:
+        print(f"Could not load {synergy_file}: {error}")
+        return None
+
+
+# Function to show the synergy matrix of a loaded snapshot (Tk thread)
+def set_synergy_matrix(matrix):
+    global synergy_matrix
+    synergy_matrix = matrix
+    if matrix is None:
+        synergy_card_combobox["values"] = []
+        synergy_status_label.config(
+            text="No card synergy for this snapshot, build it from 17lands game "
+            "data with: python -m mtgaseer aggregate --synergy"
+        )
+    else:
+        synergy_card_combobox["values"] = matrix.card_names()
+        synergy_status_label.config(text="")
+    show_synergy()
+
+
+# Function to list the best partners of the selected card (a slice of the
+# precomputed matrix)
+@timed("synergy.show")
+def show_synergy(event=None):
+    if synergy_matrix is None:
+        synergy_table.set_data(pd.DataFrame(columns=SYNERGY_COLUMNS))
+        return
+    partners = synergy_matrix.partners(
+        synergy_card_var.get().strip(),
+        synergy_kinds[synergy_kind_var.get()],
+        top=synergy_top_cards,
+    )
+    synergy_table.set_data(partners)
+
+
+synergy_card_combobox.bind("<<ComboboxSelected>>", show_synergy)
+synergy_card_combobox.bind("<Return>", show_synergy)
+synergy_kind_combobox.bind("<<ComboboxSelected>>", show_synergy)
+
+
+#######################################################
+# GUI SETUP - DATA SNAPSHOT (SET AND DATE) SELECTION
+#######################################################
+
+# How often the data folder is checked for new exports (milliseconds)
+catalog_poll_ms = 5000
+
+snapshot_label_widget = tk.Label(
+    snapshot_frame,
+    text="Data Snapshot:",
+    font=("Helvetica", 12),
+    background="#dcdad5",
+)
+snapshot_label_widget.pack(side=tk.LEFT, padx=(0, 10))
+
+snapshot_var = tk.StringVar()
+snapshot_combobox = ttk.Combobox(
+    snapshot_frame, textvariable=snapshot_var, state="readonly"
+)
+snapshot_combobox.pack(side=tk.LEFT)
+
+snapshots_by_label = {}  # Combobox text -> snapshot
+
+
+# Function to list the snapshots of the catalog in the combobox, newest first
+def update_snapshot_choices():
+    snapshots_by_label.clear()
+    for snapshot in catalog.snapshots():
+        snapshots_by_label[snapshot_label(snapshot)] = snapshot
+    snapshot_combobox["values"] = list(snapshots_by_label)
+    snapshot_combobox.set(snapshot_label(current_snapshot))
+
+
+#######################################################
+# BACKGROUND LOADING (THE WINDOW NEVER WAITS FOR FILES)
+#######################################################
+
+# Files are parsed in a worker thread, results come back through a queue
+background_tasks = BackgroundTasks(root)
+
+# Widgets disabled while loading, and the state they had before
+busy_widgets = [
+    snapshot_combobox,
+    color_selection_combobox,
+    color_combo_combobox,
+    difference_stat_combobox,
+]
+busy_widget_states = {}
+
+
+# Function to show (or end) the busy state while data is loaded
+def set_busy(busy):
+    if busy:
+        for widget in busy_widgets:
+            busy_widget_states[widget] = str(widget["state"])
+            widget["state"] = "disabled"
+        root.config(cursor="watch")
+    else:
+        for widget in busy_widgets:
+            widget["state"] = busy_widget_states.pop(widget, "readonly")
+        root.config(cursor="")
+
+
+# Function to show how many files of a snapshot are loaded
+def show_load_progress(snapshot, done, total):
+    title_label.config(text=f"Loading {snapshot_label(snapshot)}: {done}/{total} files")
+
+
+# Function to load a snapshot in the background: its files are parsed in the
+# worker (several at the same time), then finish_loading shows it. The shown
+# data stays usable meanwhile. The time series of its set is updated later.
+def start_loading(snapshot):
+    set_busy(True)
+    title_label.config(text=f"Loading {snapshot_label(snapshot)}...")
+    select_snapshot(dataset_store, catalog, snapshot)
+    colors_file = catalog.colors_file(snapshot)
+    if colors_file is None:
+        print(f"Colors file not found for {snapshot_label(snapshot)}")
+    jobs, pending = snapshot_jobs(dataset_store, colors_file)
+
+    # Worker thread: only parses files, the dataset store is left to Tk
+    def load(progress):
+        with span("load.parse_files"):
+            parsed = parse_files(jobs, DEFAULT_INGEST_WORKERS, progress)
+        return parsed, load_synergy(snapshot)
+
+    background_tasks.run(
+        load,
+        lambda result: finish_loading(snapshot, pending, result),
+        on_progress=lambda done, total, key: show_load_progress(snapshot, done, total),
+        on_error=lambda error: loading_failed(snapshot, error),
+    )
+
+
+# Function to show a loaded snapshot in every tab (Tk thread)
+@timed("load.finish")
+def finish_loading(snapshot, pending, result):
+    global current_snapshot, trend_store
+    (results, errors), synergy = result
+    if snapshot.set_code != current_snapshot.set_code:
+        # Only reads its meta.json, the new exports are added afterwards
+        trend_store = open_time_series(catalog, snapshot.set_code)
+    current_snapshot = snapshot
+    try:
+        colors = store_snapshot(dataset_store, pending, results, errors)
+    except OSError as error:
+        print(f"Could not load {snapshot_label(snapshot)}: {error}")
+        messagebox.showerror("Error", f"Could not load a file: {error}")
+        colors = None
+    set_color_stats(colors)
+    two_color_table.set_data(get_two_color_winrates())
+    precompute_draft_stat_maps()
+    set_busy(False)
+
+    if mtg_data_key in dataset_store:
+        load_data_from_file(mtg_data_key)
+        update_title(mtg_data_key)
+        filter_data(search_var.get())
+    else:
+        # The selected archetype has no file in this snapshot
+        color_selection_combobox.set("All Colors")
+        on_color_selected(None)
+    show_differences()
+    set_synergy_matrix(synergy)
+    start_trend_update()
+
+
+# Function to go back to the shown snapshot when loading another one failed
+def loading_failed(snapshot, error):
+    print(f"Could not load {snapshot_label(snapshot)}: {error}")
+    select_snapshot(dataset_store, catalog, current_snapshot)
+    set_busy(False)
+    snapshot_combobox.set(snapshot_label(current_snapshot))
+    update_title(mtg_data_key)
+    messagebox.showerror("Error", f"Could not load {snapshot_label(snapshot)}")
+
+
+# Event handler for snapshot selection: only the new snapshot is parsed, and
+# every tab is refreshed with it once loaded
+def on_snapshot_selected(event=None):
+    snapshot = snapshots_by_label.get(snapshot_var.get())
+    if snapshot is None or snapshot == current_snapshot or background_tasks.busy():
+        return
+    start_loading(snapshot)
+
+
+snapshot_combobox.bind("<<ComboboxSelected>>", on_snapshot_selected)
+update_snapshot_choices()
+
+
+# The time series is updated by its own worker, so a long first update (every
+# older export of the set) never holds back loading a snapshot
+trend_tasks = BackgroundTasks(root)
+
+
+# Function to show the new exports of the set once they are in the time series
+def finish_trend_update(set_code, store, ingested):
+    global trend_store
+    if set_code != current_snapshot.set_code:
+        return  # Another set was loaded meanwhile
+    trend_store = store
+    if ingested and mtg_data_key in dataset_store:
+        load_data_from_file(mtg_data_key)
+        filter_data(search_var.get())
+
+
+# Function to update the time series of the shown set in the background. The
+# worker writes to its own store, the shown one is only read by the Tk thread
+# and is swapped for it once the update is done.
+def start_trend_update():
+    set_code = current_snapshot.set_code
+
+    def update(progress):
+        with span("load.time_series"):
+            store = open_time_series(catalog, set_code)
+            return store, update_trend_store(store, set_code)
+
+    trend_tasks.run(
+        update,
+        lambda result: finish_trend_update(set_code, *result),
+        on_error=lambda error: print(f"Could not update the time series: {error}"),
+    )
+
+
+# Function to pick up exports added to (or removed from) the data folder
+def poll_catalog():
+    busy = background_tasks.busy() or trend_tasks.busy()
+    if not busy and catalog.refresh():
+        if catalog.card_ratings_files(current_snapshot):
+            # New archetype files of the shown snapshot become available
+            select_snapshot(dataset_store, catalog, current_snapshot)
+        update_snapshot_choices()
+        # New daily exports of the set extend the trend of the shown data
+        start_trend_update()
+    root.after(catalog_poll_ms, poll_catalog)
+
+
+# Show the window right away, the first snapshot is loaded in the background
+start_loading(current_snapshot)
+root.after(catalog_poll_ms, poll_catalog)
+
+
 #######################################################
 # MAIN EVENT LOOP
 #######################################################
 
 root.mainloop()
+
+# Timings asked for on the command line (or with MTGASEER_PERF_FILE)
+if perf_file:
+    recorder.dump(perf_file)
+    print(f"Timings written to {perf_file}")
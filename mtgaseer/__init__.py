@@ -0,0 +1,2 @@
+# MTGA Seer - data loading and analysis helpers shared by the GUI (main.py)
+# and the other scripts of the project.
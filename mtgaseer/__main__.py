@@ -0,0 +1,5 @@
+import sys
+
+from mtgaseer.cli import main
+
+sys.exit(main())
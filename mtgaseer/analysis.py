@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from mtgaseer.card_registry import CardRegistry, CardTable
+
+
+#######################################################
+# CROSS-ARCHETYPE DIFFERENCES
+#######################################################
+
+# Stats compared between the overall data and each archetype
+DIFFERENCE_STATS = ["GIH WR", "IWD", "GP WR", "ALSA"]
+
+# Columns of the table returned by biggest_differences
+DIFFERENCE_COLUMNS = [
+    "Stat",
+    "Name",
+    "Archetype",
+    "Overall",
+    "Archetype Value",
+    "Difference",
+]
+
+
+# Function to stack card ratings tables into one stat × card × archetype array.
+# `archetypes` maps any key (a color code, or (set, code) for several sets) to
+# its table. Tables are DataFrames or CardTables of `registry` (a temporary
+# registry is used when none is given); cards are aligned by card id, so no
+# name is hashed twice. Returns the card names, the archetype keys, the
+# stacked values (NaN where a card is missing or has no value) and the
+# overall values (stat × card).
+def stack_archetypes(overall, archetypes, stats=DIFFERENCE_STATS, registry=None):
+    registry = CardRegistry() if registry is None else registry
+    keys = list(archetypes)
+    tables = [_card_table(registry, overall, stats)]
+    tables += [_card_table(registry, archetypes[key], stats) for key in keys]
+
+    # Only the cards of these tables, in card id order
+    card_ids = np.unique(np.concatenate([table.card_ids for table in tables]))
+
+    base = tables[0].lookup(card_ids, stats)
+    values = np.full((len(stats), len(card_ids), len(keys)), np.nan, dtype=np.float32)
+    for column, table in enumerate(tables[1:]):
+        values[:, :, column] = table.lookup(card_ids, stats)
+    return registry.names(card_ids), keys, values, base
+
+
+# A CardTable for a DataFrame (or the CardTable itself)
+def _card_table(registry, data, stats):
+    if isinstance(data, CardTable):
+        return data
+    return registry.table(data, stats)
+
+
+# Function to find, for every stat at once, the cards whose value in some
+# archetype differs the most from the overall data. Each card counts once per
+# stat (with its most different archetype) and the `top` biggest absolute
+# differences of each stat are returned, biggest first.
+def biggest_differences(
+    overall, archetypes, stats=DIFFERENCE_STATS, top=10, registry=None
+):
+    names, keys, values, base = stack_archetypes(overall, archetypes, stats, registry)
+    if not len(keys) or not len(names):
+        return pd.DataFrame(columns=DIFFERENCE_COLUMNS)
+
+    deltas = values - base[:, :, np.newaxis]  # stat × card × archetype
+    magnitude = np.where(np.isnan(deltas), -np.inf, np.abs(deltas))
+
+    # Most different archetype of every card, for every stat
+    best_key = magnitude.argmax(axis=2)
+    best_magnitude = np.take_along_axis(magnitude, best_key[..., np.newaxis], 2)
+    best_magnitude = best_magnitude[..., 0]  # stat × card
+
+    frames = []
+    for index, stat in enumerate(stats):
+        scores = best_magnitude[index]
+        count = min(top, int(np.isfinite(scores).sum()))
+        if count == 0:
+            continue
+        # Partial selection of the top cards, then sort only those
+        chosen = np.argpartition(-scores, count - 1)[:count]
+        chosen = chosen[np.argsort(-scores[chosen], kind="stable")]
+        chosen_keys = best_key[index, chosen]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Stat": stat,
+                    "Name": names[chosen],
+                    "Archetype": [keys[key] for key in chosen_keys],
+                    "Overall": base[index, chosen],
+                    "Archetype Value": values[index, chosen, chosen_keys],
+                    "Difference": deltas[index, chosen, chosen_keys],
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=DIFFERENCE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,267 @@
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from mtgaseer.perf import timed
+
+
+#######################################################
+# MTG ARENA PLAYER.LOG READER
+#######################################################
+
+# Event emitted by the reader: `kind` is one of the EVENT_* names below and
+# `data` a dictionary with the details of the event
+LogEvent = namedtuple("LogEvent", ["kind", "data"])
+
+EVENT_LOGIN = "login"  # {"display_name"}
+EVENT_DRAFT_PACK = "draft_pack"  # {"event", "pack", "pick", "card_ids"}
+EVENT_DRAFT_PICK = "draft_pick"  # {"event", "pack", "pick", "card_ids"}
+EVENT_DECK_SUBMIT = "deck_submit"  # {"event", "card_ids"} (one id per copy)
+
+# Most bytes read from the log in one poll, so a long log read from the start
+# is consumed in steps instead of freezing the caller
+DEFAULT_MAX_BYTES_PER_POLL = 8 * 1024 * 1024
+
+# Precompiled patterns for the lines we care about
+_LOGIN = re.compile(
+    r"\[Accounts - Login\] Logged in successfully\. Display Name: (.+?#\d+)"
+)
+_DRAFT_NOTIFY = re.compile(r"Draft\.Notify (\{.*\})")
+_REQUEST = re.compile(
+    r"==> (Event_PlayerDraftMakePick|BotDraft_DraftPick|Event_SetDeck\w*) (\{.*\})"
+)
+_RESPONSE = re.compile(
+    r"<== (BotDraft_DraftStatus|BotDraft_DraftPick)(?:\([^)]*\))?\s*(\{.*\})?"
+)
+
+# Cheap substring test done before any regular expression
+_INTERESTING = ("Display Name", "Draft", "Event_SetDeck")
+
+
+# Function to find the Player.log of the current user (Windows or macOS)
+def default_log_path():
+    if sys.platform == "darwin":
+        return os.path.expanduser(
+            "~/Library/Logs/Wizards Of The Coast/MTGA/Player.log"
+        )
+    return os.path.join(
+        os.path.expanduser("~"),
+        "AppData",
+        "LocalLow",
+        "Wizards Of The Coast",
+        "MTGA",
+        "Player.log",
+    )
+
+
+# Follows a growing text file. It remembers the byte offset already read and
+# only reads what was appended since the previous call; when the file is
+# truncated or replaced (MTG Arena starts a new log on every launch) it starts
+# again from the beginning. Incomplete last lines are kept for the next call.
+class LogTailer:
+    def __init__(self, file_path, max_bytes=DEFAULT_MAX_BYTES_PER_POLL):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.caught_up = True  # False while a poll left unread bytes behind
+        self._file_id = None
+        self._partial = b""
+
+    # Skip everything already in the file, only new lines will be returned
+    def seek_to_end(self):
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self.offset = stat.st_size
+        self._partial = b""
+
+    # Return the complete lines appended since the last call
+    @timed("player_log.read")
+    def read_lines(self):
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return []
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self.offset:
+            # New or truncated log: read it from the start
+            self._file_id = file_id
+            self.offset = 0
+            self._partial = b""
+        if stat.st_size == self.offset:
+            self.caught_up = True
+            return []
+
+        with open(self.file_path, "rb") as file:
+            file.seek(self.offset)
+            chunk = file.read(self.max_bytes)
+        self.offset += len(chunk)
+        self.caught_up = self.offset >= stat.st_size
+
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()  # Not terminated yet
+        return [
+            line.decode("utf-8", errors="replace").rstrip("\r") for line in lines
+        ]
+
+
+# Turns Player.log lines into LogEvent objects. Responses may have their JSON
+# body on the line after their header, so the parser keeps that little state.
+class ArenaLogParser:
+    def __init__(self):
+        self._pending_response = None  # Response name waiting for its body
+
+    @timed("player_log.parse")
+    def parse_lines(self, lines):
+        events = []
+        for line in lines:
+            events.extend(self.parse_line(line))
+        return events
+
+    def parse_line(self, line):
+        if self._pending_response is not None:
+            name = self._pending_response
+            self._pending_response = None
+            if line.startswith("{"):
+                return self._parse_response(name, line)
+
+        if not any(token in line for token in _INTERESTING):
+            return []
+
+        match = _LOGIN.search(line)
+        if match:
+            return [LogEvent(EVENT_LOGIN, {"display_name": match.group(1)})]
+
+        match = _DRAFT_NOTIFY.search(line)
+        if match:
+            return _draft_notify_events(_load_json(match.group(1)))
+
+        match = _REQUEST.search(line)
+        if match:
+            return _request_events(match.group(1), _load_json(match.group(2)))
+
+        match = _RESPONSE.search(line)
+        if match:
+            if match.group(2) is None:
+                self._pending_response = match.group(1)
+                return []
+            return self._parse_response(match.group(1), match.group(2))
+
+        return []
+
+    def _parse_response(self, name, body):
+        payload = _load_json(_load_json(body).get("Payload", "{}"))
+        cards = payload.get("DraftPack") or []
+        if not cards:
+            return []
+        return [
+            LogEvent(
+                EVENT_DRAFT_PACK,
+                {
+                    "event": payload.get("EventName", ""),
+                    # Quick drafts count packs and picks from 0
+                    "pack": int(payload.get("PackNumber", 0)) + 1,
+                    "pick": int(payload.get("PickNumber", 0)) + 1,
+                    "card_ids": _card_ids(cards),
+                },
+            )
+        ]
+
+
+# Reads the new part of Player.log and returns the events found in it
+class PlayerLogReader:
+    def __init__(self, file_path=None, from_start=True):
+        self.tailer = LogTailer(file_path or default_log_path())
+        self.parser = ArenaLogParser()
+        if not from_start:
+            self.tailer.seek_to_end()
+
+    @property
+    def file_path(self):
+        return self.tailer.file_path
+
+    def poll(self):
+        return self.parser.parse_lines(self.tailer.read_lines())
+
+
+# Premier/traditional drafts announce each pack with Draft.Notify
+def _draft_notify_events(message):
+    cards = message.get("PackCards", "")
+    if not cards:
+        return []
+    return [
+        LogEvent(
+            EVENT_DRAFT_PACK,
+            {
+                "event": message.get("draftId", ""),
+                "pack": int(message.get("SelfPack", 1)),
+                "pick": int(message.get("SelfPick", 1)),
+                "card_ids": _card_ids(cards.split(",")),
+            },
+        )
+    ]
+
+
+# Picks and deck submissions are requests sent by the client
+def _request_events(name, message):
+    request = _load_json(message.get("request", "{}"))
+
+    if name == "Event_PlayerDraftMakePick":
+        return [
+            LogEvent(
+                EVENT_DRAFT_PICK,
+                {
+                    "event": request.get("DraftId", ""),
+                    "pack": int(request.get("Pack", 1)),
+                    "pick": int(request.get("Pick", 1)),
+                    "card_ids": _card_ids(request.get("GrpIds", [])),
+                },
+            )
+        ]
+
+    if name == "BotDraft_DraftPick":
+        info = request.get("PickInfo", {})
+        return [
+            LogEvent(
+                EVENT_DRAFT_PICK,
+                {
+                    "event": request.get("EventName", ""),
+                    "pack": int(info.get("PackNumber", 0)) + 1,
+                    "pick": int(info.get("PickNumber", 0)) + 1,
+                    "card_ids": _card_ids([info.get("CardId")]),
+                },
+            )
+        ]
+
+    # Event_SetDeck / Event_SetDeckV2
+    deck = request.get("Deck", {})
+    card_ids = []
+    for card in deck.get("MainDeck", []):
+        copies = int(card.get("quantity", 1))
+        card_ids.extend(_card_ids([card.get("cardId")]) * copies)
+    return [
+        LogEvent(
+            EVENT_DECK_SUBMIT,
+            {"event": request.get("EventName", ""), "card_ids": card_ids},
+        )
+    ]
+
+
+def _card_ids(values):
+    return [int(value) for value in values if str(value).strip().isdigit()]
+
+
+# Log messages often nest JSON documents as strings; bad JSON means no data
+def _load_json(text):
+    if isinstance(text, dict):
+        return text
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    return value if isinstance(value, dict) else {}
@@ -0,0 +1,81 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+#######################################################
+# BACKGROUND TASKS FOR A TK WINDOW
+#######################################################
+
+# How often the Tk thread checks for progress and finished tasks
+DEFAULT_POLL_MS = 50
+
+
+# Runs long jobs (loading a snapshot, ...) in a worker thread so the Tk window
+# keeps responding. Everything the worker reports is handed back to the Tk
+# thread through a queue polled with `after`, so callbacks can touch widgets.
+#
+# `job(progress)` runs in the worker and may call `progress(*args)` any number
+# of times; `on_progress(*args)` then `on_done(result)` (or `on_error(error)`,
+# which re-raises on the Tk thread by default) are called on the Tk thread, in
+# that order. Tasks run one at a time, in the order they were started.
+class BackgroundTasks:
+    def __init__(self, widget, poll_ms=DEFAULT_POLL_MS):
+        self.widget = widget
+        self.poll_ms = poll_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._messages = queue.Queue()
+        self._outstanding = 0  # Tasks started and not reported back yet
+        self._polling = False
+
+    # Start a job in the worker thread
+    def run(self, job, on_done, on_progress=None, on_error=None):
+        self._outstanding += 1
+        self._executor.submit(self._run, job, on_done, on_progress, on_error)
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    # True while a task is running or waiting for the worker
+    def busy(self):
+        return self._outstanding > 0
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # Worker thread: run the job, queue its progress and its outcome
+    def _run(self, job, on_done, on_progress, on_error):
+        def progress(*args):
+            if on_progress is not None:
+                self._messages.put((on_progress, args, False))
+
+        try:
+            result = job(progress)
+        except Exception as error:
+            self._messages.put((on_error or _raise, (error,), True))
+        else:
+            self._messages.put((on_done, (result,), True))
+
+    # Tk thread: call the callbacks of everything reported, poll while tasks run
+    def _poll(self):
+        reported = []
+        while True:
+            try:
+                callback, args, finished = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if finished:
+                self._outstanding -= 1
+            reported.append((callback, args))
+
+        if self._outstanding:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+        for callback, args in reported:
+            callback(*args)
+
+
+def _raise(error):
+    raise error
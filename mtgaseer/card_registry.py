@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from mtgaseer.cleaning import MISSING_TEXT
+
+
+#######################################################
+# CARD REGISTRY (ONE INTEGER ID PER CARD NAME)
+#######################################################
+
+# Growth step of the per-card arrays of a registry
+_GROW_BY = 1024
+
+
+# Interns every card name once and gives it a dense integer id (0, 1, 2, ...)
+# shared by all the datasets of all the sets and archetypes. Color and rarity
+# are kept once per card as small category codes. Stat tables built with
+# `table()` are arrays indexed by card id, so joining two datasets is array
+# indexing instead of hashing the name strings again.
+class CardRegistry:
+    def __init__(self):
+        self._ids = {}  # name -> id
+        self._names = []  # id -> name
+        self._color_codes = np.zeros(0, dtype=np.int8)  # id -> color code
+        self._rarity_codes = np.zeros(0, dtype=np.int8)  # id -> rarity code
+        # Category code -> text ("-" is code 0, for missing values)
+        self.color_names = [MISSING_TEXT]
+        self.rarity_names = [MISSING_TEXT]
+
+    def __len__(self):
+        return len(self._names)
+
+    # Function to get the ids of card names (an array or a Series), registering
+    # the new ones
+    def ids(self, names):
+        codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        unique_ids = np.empty(len(uniques), dtype=np.int32)
+        for index, name in enumerate(uniques):
+            card_id = self._ids.get(name)
+            if card_id is None:
+                card_id = self._ids[name] = len(self._names)
+                self._names.append(name)
+            unique_ids[index] = card_id
+        self._reserve(len(self._names))
+        return unique_ids[codes]
+
+    # Function to get the ids of card names without registering anything
+    # (-1 for unknown names)
+    def lookup(self, names):
+        return np.array([self._ids.get(name, -1) for name in names], dtype=np.int32)
+
+    # Function to get the names of card ids as an object array
+    def names(self, card_ids=None):
+        names = np.array(self._names, dtype=object)
+        return names if card_ids is None else names[card_ids]
+
+    # Color and rarity codes of every card (index with card ids)
+    def color_codes(self):
+        return self._color_codes[: len(self)]
+
+    def rarity_codes(self):
+        return self._rarity_codes[: len(self)]
+
+    # Function to get the code of a color or rarity text (-1 when unknown)
+    def color_code(self, color):
+        return _category_code(self.color_names, color)
+
+    def rarity_code(self, rarity):
+        return _category_code(self.rarity_names, rarity)
+
+    # Function to register the cards of a card ratings table and build its stat
+    # arrays indexed by card id
+    def table(self, data, stats):
+        card_ids = self.ids(data["Name"])
+        if "Color" in data:
+            self._record(self._color_codes, self.color_names, card_ids, data["Color"])
+        if "Rarity" in data:
+            self._record(
+                self._rarity_codes, self.rarity_names, card_ids, data["Rarity"]
+            )
+        return CardTable(self, card_ids, data, stats)
+
+    # Keep room in the per-card arrays for `count` cards
+    def _reserve(self, count):
+        if count <= len(self._color_codes):
+            return
+        size = count + _GROW_BY
+        self._color_codes = _resized(self._color_codes, size)
+        self._rarity_codes = _resized(self._rarity_codes, size)
+
+    # Store the category codes of some cards, adding the new texts
+    def _record(self, codes, category_names, card_ids, texts):
+        text_codes, uniques = pd.factorize(texts.fillna(MISSING_TEXT).to_numpy())
+        mapping = np.empty(len(uniques), dtype=np.int8)
+        for index, text in enumerate(uniques):
+            if text not in category_names:
+                category_names.append(text)
+            mapping[index] = category_names.index(text)
+        codes[card_ids] = mapping[text_codes]
+
+
+# The stats of one dataset, looked up by card id (NaN for cards of the
+# registry that are not in the dataset). `card_ids` gives the card id of every
+# row of the original table. The values are kept for the cards of the dataset
+# only (sorted by card id), so memory does not grow with the cards that other
+# datasets add to the registry.
+class CardTable:
+    def __init__(self, registry, card_ids, data, stats):
+        self.registry = registry
+        self.card_ids = card_ids
+        self.stats = list(stats)
+        values = data[self.stats].to_numpy(dtype=np.float32).T
+        # The last row of a card wins, like a scatter by card id would
+        last_rows = len(card_ids) - 1 - np.unique(card_ids[::-1], return_index=True)[1]
+        self._ids = card_ids[last_rows]  # Sorted
+        self._values = values[:, last_rows]
+
+    # Function to get the values of some stats (stat × card) for the given
+    # card ids
+    def lookup(self, card_ids, stats=None):
+        rows = [self.stats.index(stat) for stat in stats or self.stats]
+        card_ids = np.asarray(card_ids)
+        values = np.full((len(rows), len(card_ids)), np.nan, np.float32)
+        if not len(self._ids):
+            return values
+        positions = np.searchsorted(self._ids, card_ids)
+        positions = np.minimum(positions, len(self._ids) - 1)
+        found = self._ids[positions] == card_ids
+        values[:, found] = self._values[rows][:, positions[found]]
+        return values
+
+    # Function to get the values of some stats (stat × card id) for the current
+    # size of the registry (cards registered later are NaN)
+    def matrix(self, stats=None):
+        rows = [self.stats.index(stat) for stat in stats or self.stats]
+        values = np.full((len(rows), len(self.registry)), np.nan, np.float32)
+        values[:, self._ids] = self._values[rows]
+        return values
+
+    # Function to get one stat indexed by card id
+    def column(self, stat):
+        return self.matrix([stat])[0]
+
+
+def _category_code(category_names, text):
+    return category_names.index(text) if text in category_names else -1
+
+
+def _resized(codes, size):
+    resized = np.zeros(size, dtype=codes.dtype)
+    resized[: len(codes)] = codes
+    return resized
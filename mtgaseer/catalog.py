@@ -0,0 +1,131 @@
+import os
+import re
+from collections import namedtuple
+
+
+#######################################################
+# DATA FOLDER CATALOG (SETS, DATES AND ARCHETYPES)
+#######################################################
+
+# One 17lands export: the set code ("" when unknown) and the export date
+Snapshot = namedtuple("Snapshot", ["set_code", "date"])
+
+# Names of the 17lands files, with an optional set code before the date:
+# card-ratings-2023-11-20.csv, card-ratings-LCI-2023-11-20(WU).csv,
+# colors-LCI-2023-11-20.csv, ...
+_FILE_NAME = re.compile(
+    r"^(?P<kind>card-ratings|colors)-(?:(?P<set>[A-Za-z0-9]+)-)?"
+    r"(?P<date>\d{4}-\d{2}-\d{2})(?:\((?P<code>[WUBRG]{1,5})\))?\.csv$"
+)
+
+# Names of the card synergy files built from game data, like the 17lands
+# files: synergy-LCI-2023-11-20.npz
+_SYNERGY_FILE_NAME = re.compile(
+    r"^(?P<kind>synergy)-(?:(?P<set>[A-Za-z0-9]+)-)?"
+    r"(?P<date>\d{4}-\d{2}-\d{2})\.npz$"
+)
+
+
+# Function to match a file name with the 17lands or the synergy file names
+# (None when it is neither)
+def _match_file_name(file_name):
+    return _FILE_NAME.match(file_name) or _SYNERGY_FILE_NAME.match(file_name)
+
+
+# Function to show a snapshot in the GUI or in messages
+def snapshot_label(snapshot):
+    if snapshot.set_code:
+        return f"{snapshot.set_code} {snapshot.date}"
+    return snapshot.date
+
+
+# Index of the 17lands files of a data folder by set, date and archetype.
+# The folder is scanned once (sub-folders too, a sub-folder name is used as
+# set code for files without one) and only file names are read, so a folder
+# with a year of daily exports costs nothing until a snapshot is loaded.
+# `refresh()` rescans only when a folder changed, for cheap polling.
+class DataCatalog:
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._card_ratings = {}  # snapshot -> {archetype code or None: path}
+        self._colors = {}  # snapshot -> path
+        self._synergy = {}  # snapshot -> path
+        self._signature = None
+        self.scan()
+
+    # Read the file names of the data folder again
+    def scan(self):
+        self._card_ratings = {}
+        self._colors = {}
+        self._synergy = {}
+        for folder, file_names in self._walk():
+            relative = os.path.relpath(folder, self.data_dir)
+            folder_set = "" if relative == "." else relative.split(os.sep)[0]
+            for file_name in file_names:
+                match = _match_file_name(file_name)
+                if match is None:
+                    continue
+                snapshot = Snapshot(
+                    (match.group("set") or folder_set).upper(), match.group("date")
+                )
+                path = os.path.join(folder, file_name)
+                if match.group("kind") == "synergy":
+                    self._synergy[snapshot] = path
+                elif match.group("kind") == "colors":
+                    self._colors[snapshot] = path
+                else:
+                    self._card_ratings.setdefault(snapshot, {})[
+                        match.group("code")
+                    ] = path
+        self._signature = self._folders_signature()
+
+    # Rescan if a file was added, removed or renamed; True when it changed
+    def refresh(self):
+        if self._folders_signature() == self._signature:
+            return False
+        self.scan()
+        return True
+
+    # Snapshots having card ratings, newest first
+    def snapshots(self):
+        return sorted(
+            self._card_ratings,
+            key=lambda snapshot: (snapshot.date, snapshot.set_code),
+            reverse=True,
+        )
+
+    def latest(self):
+        snapshots = self.snapshots()
+        return snapshots[0] if snapshots else None
+
+    # Find a snapshot by date and/or set code (the newest one matching)
+    def find(self, date=None, set_code=None):
+        for snapshot in self.snapshots():
+            if date is not None and snapshot.date != date:
+                continue
+            if set_code is not None and snapshot.set_code != set_code.upper():
+                continue
+            return snapshot
+        return None
+
+    # Card ratings files of a snapshot: {None: overall file, "WU": ..., ...}
+    def card_ratings_files(self, snapshot):
+        return dict(self._card_ratings.get(snapshot, {}))
+
+    # Color win rates file of a snapshot (None when missing)
+    def colors_file(self, snapshot):
+        return self._colors.get(snapshot)
+
+    # Card synergy file of a snapshot (None when missing)
+    def synergy_file(self, snapshot):
+        return self._synergy.get(snapshot)
+
+    # Folders and their file names; hidden folders (like the cache) are skipped
+    def _walk(self):
+        for folder, sub_folders, file_names in os.walk(self.data_dir):
+            sub_folders[:] = [name for name in sub_folders if not name.startswith(".")]
+            yield folder, file_names
+
+    # Adding, removing or renaming a file changes its folder's mtime
+    def _folders_signature(self):
+        return [(folder, os.stat(folder).st_mtime_ns) for folder, _ in self._walk()]
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from mtgaseer.perf import span
+
+
+#######################################################
+# COLUMN DEFINITIONS
+#######################################################
+
+# Columns stored as percentages in the 17lands files (e.g. "59.5%")
+PERCENTAGE_COLUMNS = ["% GP", "GP WR", "OH WR", "GD WR", "GIH WR", "GNS WR"]
+
+# Columns stored as percentage points in the 17lands files (e.g. "11.9pp")
+POINTS_COLUMNS = ["IWD"]
+
+# Columns holding averages (e.g. "1.19")
+AVERAGE_COLUMNS = ["ALSA", "ATA"]
+
+# Columns holding counts (e.g. "4229")
+COUNT_COLUMNS = ["# Seen", "# Picked", "# GP", "# OH", "# GD", "# GIH", "# GNS"]
+
+# Columns of a 17lands card ratings export, in file order
+CARD_RATINGS_COLUMNS = ["Name", "Color", "Rarity", "# Seen", "ALSA", "# Picked"]
+CARD_RATINGS_COLUMNS += ["ATA", "# GP", "% GP", "GP WR", "# OH", "OH WR", "# GD"]
+CARD_RATINGS_COLUMNS += ["GD WR", "# GIH", "GIH WR", "# GNS", "GNS WR", "IWD"]
+
+# Text columns, where blank cells are shown as "-"
+TEXT_COLUMNS = ["Color", "Rarity"]
+
+# Text used for missing values when displaying the data
+MISSING_TEXT = "-"
+
+# Number of decimals shown for each kind of numeric column
+_DECIMALS = {
+    **{col: 1 for col in PERCENTAGE_COLUMNS},
+    **{col: 1 for col in POINTS_COLUMNS},
+    **{col: 2 for col in AVERAGE_COLUMNS},
+    **{col: 0 for col in COUNT_COLUMNS},
+}
+
+
+#######################################################
+# PARSING AND CLEANING
+#######################################################
+
+
+# Function to parse a column into numbers, blank or invalid cells become NaN.
+# Plain string methods drop the spaces and the "%"/"pp" suffix (faster than a
+# regex replace).
+def parse_numeric(series, dtype="float32"):
+    if not pd.api.types.is_numeric_dtype(series):
+        text = series.str.strip().str.removesuffix("%").str.removesuffix("pp")
+        series = pd.to_numeric(text, errors="coerce")
+    return series.astype(dtype)
+
+
+# Function to parse a count column: int32 when complete, float32 (NaN) otherwise
+def parse_count(series):
+    values = parse_numeric(series, "float32")
+    if values.isna().any():
+        return values
+    return values.astype("int32")
+
+
+# Function to clean a raw card ratings table (modified and returned):
+# numeric columns become float32/int32 with real NaN, text columns are stripped
+def clean_card_ratings(data):
+    for col in PERCENTAGE_COLUMNS + POINTS_COLUMNS + AVERAGE_COLUMNS:
+        if col in data:
+            data[col] = parse_numeric(data[col])
+    for col in COUNT_COLUMNS:
+        if col in data:
+            data[col] = parse_count(data[col])
+    for col in TEXT_COLUMNS:
+        if col in data:
+            # A column without any text is read as float (all NaN)
+            text = data[col].fillna("").astype(str).str.strip()
+            data[col] = text.replace("", MISSING_TEXT)
+    data["Name"] = data["Name"].str.strip()
+    return data
+
+
+# Function to read and clean a 17lands card ratings file
+def read_card_ratings(file_path):
+    # "utf-8-sig" drops the BOM in front of the first header of 17lands exports
+    with span("load.read_csv"):
+        data = pd.read_csv(file_path, encoding="utf-8-sig")
+    with span("load.clean"):
+        return clean_card_ratings(data)
+
+
+# Function to read and clean a 17lands color (deck archetype) ratings file
+def read_color_ratings(file_path):
+    data = pd.read_csv(file_path, encoding="utf-8-sig")
+    data["Color"] = data["Color"].str.strip()
+    data["Win Rate"] = parse_numeric(data["Win Rate"])
+    for col in ["Wins", "# Games"]:
+        if col in data:
+            data[col] = parse_count(data[col])
+    return data
+
+
+#######################################################
+# DISPLAY FORMATTING (RENDER TIME ONLY)
+#######################################################
+
+
+# Function to format a single value of a column for display
+def format_value(column, value):
+    if isinstance(value, str):
+        return value
+    if value is None or np.isnan(value):
+        return MISSING_TEXT
+    default_decimals = 0 if isinstance(value, (int, np.integer)) else 2
+    decimals = _DECIMALS.get(column, default_decimals)
+    return f"{value:.{decimals}f}"
+
+
+# Function to format a whole column for display, missing values become "-"
+def format_column(series):
+    if not pd.api.types.is_numeric_dtype(series):
+        return series.fillna(MISSING_TEXT).astype(str)
+    default_decimals = 0 if pd.api.types.is_integer_dtype(series) else 2
+    decimals = _DECIMALS.get(series.name, default_decimals)
+    text = series.map(f"{{:.{decimals}f}}".format, na_action="ignore")
+    return text.fillna(MISSING_TEXT)
+
+
+# Function to format a win rate for display (e.g. "59.60%")
+def format_win_rate(value):
+    if value is None or np.isnan(value):
+        return MISSING_TEXT
+    return f"{value:.2f}%"
+
+
+# Function to format a rank for display ("12", "-" for unranked cards)
+def format_rank(value):
+    if value is None or np.isnan(value):
+        return MISSING_TEXT
+    return f"{value:.0f}"
+
+
+# Function to format a change of a stat for display, always signed ("+1.20")
+def format_trend(value):
+    if value is None or np.isnan(value):
+        return MISSING_TEXT
+    return f"{value:+.2f}"
@@ -0,0 +1,226 @@
+import argparse
+import os
+import sys
+
+from mtgaseer.datasets import ARCHETYPE_CODES
+from mtgaseer.game_data import (
+    GAME_DATA_CHUNK_ROWS,
+    GAME_DATA_SHARD_BYTES,
+    read_card_info,
+    write_game_data_ratings,
+)
+from mtgaseer.game_data_pool import aggregate_game_data, checkpoint_dir_for
+from mtgaseer.ingest import DEFAULT_INGEST_WORKERS
+from mtgaseer.perf import PERF_FILE_ENV_VAR, recorder, span
+from mtgaseer.ranking import DEFAULT_MIN_GIH
+from mtgaseer.report import REPORT_FORMATS, build_report, write_report
+from mtgaseer.synergy import SYNERGY_MIN_GAMES
+
+
+#######################################################
+# COMMAND LINE INTERFACE (python -m mtgaseer ...)
+#######################################################
+
+# Data folder shipped with the project
+DEFAULT_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
+
+
+# Function to build the argument parser with all subcommands
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m mtgaseer",
+        description="MTGA Seer command line tools (no GUI needed).",
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    report = subcommands.add_parser(
+        "report",
+        help="write ranked card tables, archetype deltas and color win rates",
+    )
+    report.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    report.add_argument(
+        "--date", help="17lands export date, YYYY-MM-DD (default: newest)"
+    )
+    report.add_argument("--set", dest="set_code", help="set code, e.g. LCI")
+    report.add_argument("--output", default="reports", help="output folder")
+    report.add_argument(
+        "--format",
+        dest="formats",
+        nargs="+",
+        choices=sorted(REPORT_FORMATS),
+        default=["csv"],
+    )
+    report.add_argument(
+        "--archetypes", nargs="+", choices=ARCHETYPE_CODES, default=ARCHETYPE_CODES
+    )
+    report.add_argument(
+        "--sort-by", default="GIH WR", help="stat used to rank cards and deltas"
+    )
+    report.add_argument(
+        "--min-gih",
+        type=int,
+        default=DEFAULT_MIN_GIH,
+        help="minimum # GIH to rank a card (0 ranks every card)",
+    )
+    report.add_argument("--top", type=int, help="only keep the best N rows")
+    report.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="always parse the CSV files (ignore the compiled cache)",
+    )
+    report.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_INGEST_WORKERS,
+        help="files parsed at the same time (1: one after the other)",
+    )
+    report.add_argument(
+        "--perf-file",
+        default=os.environ.get(PERF_FILE_ENV_VAR),
+        help="write the hot path timings to this JSON file",
+    )
+    report.set_defaults(run=run_report)
+
+    aggregate = subcommands.add_parser(
+        "aggregate",
+        help="build card ratings files from raw 17lands game_data files",
+    )
+    aggregate.add_argument(
+        "game_data", nargs="+", help="game_data files (.csv or .csv.gz)"
+    )
+    aggregate.add_argument(
+        "--output", default=DEFAULT_DATA_DIR, help="folder of the card ratings files"
+    )
+    aggregate.add_argument(
+        "--set",
+        dest="set_code",
+        default="CUSTOM",
+        help="set code of the written files, name of the cut (e.g. LCIGOLD)",
+    )
+    aggregate.add_argument(
+        "--date", help="date of the written files (default: latest game counted)"
+    )
+    aggregate.add_argument("--rank", nargs="+", help="only count games of these ranks")
+    aggregate.add_argument("--from", dest="start_date", help="first day, YYYY-MM-DD")
+    aggregate.add_argument("--to", dest="end_date", help="last day, YYYY-MM-DD")
+    aggregate.add_argument(
+        "--cards", help="17lands cards.csv, for the colors and rarities of the cards"
+    )
+    aggregate.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=GAME_DATA_CHUNK_ROWS,
+        help="games read at once (memory use grows with it)",
+    )
+    aggregate.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_INGEST_WORKERS,
+        help="processes counting the files at the same time",
+    )
+    aggregate.add_argument(
+        "--shard-mb",
+        type=int,
+        default=GAME_DATA_SHARD_BYTES // (1024 * 1024),
+        help="size in MB of the parts of large .csv files counted by one process",
+    )
+    aggregate.add_argument(
+        "--no-checkpoint",
+        dest="checkpoint",
+        action="store_false",
+        help="do not save the counts of every part to resume interrupted runs",
+    )
+    aggregate.add_argument(
+        "--synergy",
+        action="store_true",
+        help="also count the card pairs and write their synergy file",
+    )
+    aggregate.add_argument(
+        "--synergy-min-games",
+        type=int,
+        default=SYNERGY_MIN_GAMES,
+        help="games two cards must be played together to keep the pair",
+    )
+    aggregate.set_defaults(run=run_aggregate)
+    return parser
+
+
+def run_report(args):
+    if args.perf_file:
+        recorder.enabled = True
+    with span("report.build"):
+        tables = build_report(
+            args.data_dir,
+            args.date,
+            args.set_code,
+            archetypes=args.archetypes,
+            sort_by=args.sort_by,
+            min_gih=args.min_gih,
+            top=args.top,
+            use_cache=args.use_cache,
+            workers=args.workers,
+        )
+    with span("report.write"):
+        paths = write_report(tables, args.output, args.formats)
+    for path in paths:
+        print(path)
+    if args.perf_file:
+        recorder.dump(args.perf_file)
+        print(args.perf_file)
+    return 0
+
+
+def run_aggregate(args):
+    def progress(done, total, shard):
+        print(f"{done}/{total} parts counted", end="\r", file=sys.stderr)
+
+    aggregator = aggregate_game_data(
+        args.game_data,
+        args.rank,
+        args.start_date,
+        args.end_date,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        shard_bytes=args.shard_mb * 1024 * 1024,
+        checkpoint_dir=checkpoint_dir_for(args.output) if args.checkpoint else None,
+        progress=progress,
+        synergy=args.synergy,
+    )
+    print(file=sys.stderr)
+    if not aggregator.games:
+        raise ValueError("No game matches the rank and date filters")
+
+    # The set code names the cut, cards of every set are looked up by name
+    card_info = read_card_info(args.cards) if args.cards else None
+    date = args.date or aggregator.last_date or args.end_date
+    if date is None:
+        raise ValueError("No game date found, use --date")
+    print(f"{aggregator.games} games counted")
+    for path in write_game_data_ratings(
+        aggregator,
+        args.output,
+        args.set_code,
+        date,
+        card_info,
+        synergy_min_games=args.synergy_min_games,
+    ):
+        print(path)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except FileNotFoundError as error:
+        print(f"File not found: {error.filename}", file=sys.stderr)
+        return 1
+    except KeyError as error:
+        print(f"Unknown column: {error}", file=sys.stderr)
+        return 1
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from mtgaseer.cleaning import format_column
+from mtgaseer.perf import timed
+
+
+#######################################################
+# COLUMN WIDTH CACHE
+#######################################################
+
+# Extra pixels added to the widest text of a column
+DEFAULT_PADDING = 10
+
+
+# Computes Treeview column widths with one shared font object. Every distinct
+# text (and character) is measured once and remembered. A text is never wider
+# than the sum of the widths of its characters, so for each column the texts
+# are measured from the widest such bound down, stopping once the bound is no
+# wider than the widest text found: a proportional font can make a short text
+# wider than a long one, and it is still found.
+class ColumnWidthCache:
+    def __init__(self, font, padding=DEFAULT_PADDING):
+        self.font = font
+        self.padding = padding
+        self._widths = {}  # text -> width in pixels
+
+    # Width in pixels of a text, measured only the first time it is seen
+    def measure(self, text):
+        width = self._widths.get(text)
+        if width is None:
+            width = self._widths[text] = self.font.measure(text)
+        return width
+
+    # Width needed by a column: its heading or its widest value, plus padding
+    def column_width(self, heading, values):
+        # Repeated values only need to be formatted once
+        texts = format_column(pd.Series(values.unique(), name=values.name)).unique()
+        max_width = self.measure(heading)
+        bounds = [sum(self.measure(char) for char in text) for text in texts]
+        for bound, text in sorted(zip(bounds, texts), reverse=True):
+            if bound <= max_width:
+                break
+            max_width = max(max_width, self.measure(text))
+        return max_width + self.padding
+
+    # Set the width of every column of a Treeview for a whole dataset, given
+    # the (heading, data column) pairs shown by it
+    @timed("table.resize_columns")
+    def resize_columns(self, tree, data, columns, formatters=None):
+        formatters = formatters or {}
+        for heading, column in columns:
+            values = data[column]
+            if column in formatters:
+                values = values.map(formatters[column])
+            # The heading gets a sort arrow when the table is sorted by it
+            width = self.column_width(f"{heading} ↓", values)
+            tree.column(heading, width=width)
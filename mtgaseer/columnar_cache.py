@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+#######################################################
+# COLUMNAR CACHE OF CLEANED FILES (.npy)
+#######################################################
+
+# Folder, inside the data folder, holding the compiled files
+CACHE_DIR_NAME = ".mtgaseer-cache"
+
+# Changing this number invalidates every cache written by older versions
+CACHE_FORMAT_VERSION = 2
+
+_META_FILE = "meta.json"
+
+
+# Wraps a loader (CSV path -> cleaned DataFrame) with a compiled cache. After
+# the first clean parse every column is written as a .npy file (text columns as
+# codes into their distinct values, kept as one UTF-8 blob), and later loads
+# memory-map the numeric columns instead of parsing the CSV again. Entries are
+# keyed by the CSV's size and modification time, with its SHA-1 as fallback (a
+# copied file with the same content is still a hit). A stale or unreadable
+# entry falls back to the CSV transparently and is rewritten.
+class ColumnarCache:
+    def __init__(self, loader, cache_dir=None):
+        self.loader = loader
+        self.cache_dir = cache_dir  # None: a folder next to each CSV file
+
+    # Load a file, from the cache when it is up to date
+    def __call__(self, file_path):
+        entry_dir = self.entry_dir(file_path)
+        stat = os.stat(file_path)
+        meta = _read_meta(entry_dir)
+
+        if meta is not None and meta.get("version") == CACHE_FORMAT_VERSION:
+            same_file = (
+                meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size
+            )
+            if same_file or (
+                meta["size"] == stat.st_size and meta["sha1"] == _sha1(file_path)
+            ):
+                try:
+                    data = _load_columns(entry_dir, meta)
+                except (OSError, ValueError):
+                    data = None  # Damaged entry, parse the CSV again
+                if data is not None:
+                    if not same_file:
+                        _write_meta(entry_dir, _source_meta(file_path, stat, meta))
+                    return data
+
+        data = self.loader(file_path)
+        try:
+            _store_columns(entry_dir, data, file_path, stat)
+        except OSError:
+            pass  # Read-only data folder: still works, just without the cache
+        return data
+
+    # Folder of the cache entry of a CSV file
+    def entry_dir(self, file_path):
+        cache_dir = self.cache_dir or os.path.join(
+            os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME
+        )
+        return os.path.join(cache_dir, os.path.basename(file_path))
+
+
+def _read_meta(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, _META_FILE), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(entry_dir, meta):
+    # Written last and atomically, so a half written entry is never used
+    temp_path = os.path.join(entry_dir, _META_FILE + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+    os.replace(temp_path, os.path.join(entry_dir, _META_FILE))
+
+
+def _source_meta(file_path, stat, meta):
+    return {
+        **meta,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": _sha1(file_path),
+    }
+
+
+# Function to memory-map every column of a cache entry into a DataFrame. Text
+# columns are rebuilt from their codes, every distinct value decoded once.
+def _load_columns(entry_dir, meta):
+    columns = {}
+    for index, (name, kind) in enumerate(meta["columns"]):
+        values = np.load(os.path.join(entry_dir, f"{index}.npy"), mmap_mode="r")
+        if kind == "text":
+            # Code -1 (missing) picks the None added at the end
+            values = _read_vocabulary(entry_dir, index)[values]
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+# Function to write a cleaned DataFrame as one .npy file per column. Text
+# columns are written as int32 codes (-1 when missing), with their distinct
+# values in a .txt blob and the byte offsets of each value in an .npy file.
+def _store_columns(entry_dir, data, file_path, stat):
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.makedirs(entry_dir)
+    columns = []
+    for index, name in enumerate(data.columns):
+        series = data[name]
+        if pd.api.types.is_numeric_dtype(series):
+            values, kind = series.to_numpy(), "numeric"
+        else:
+            codes, vocabulary = pd.factorize(series)
+            _write_vocabulary(entry_dir, index, vocabulary)
+            values, kind = codes.astype(np.int32), "text"
+        np.save(os.path.join(entry_dir, f"{index}.npy"), values)
+        columns.append((name, kind))
+    meta = {"version": CACHE_FORMAT_VERSION, "columns": columns}
+    _write_meta(entry_dir, _source_meta(file_path, stat, meta))
+
+
+def _write_vocabulary(entry_dir, index, vocabulary):
+    encoded = [str(value).encode("utf-8") for value in vocabulary]
+    offsets = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+    with open(os.path.join(entry_dir, f"{index}.txt"), "wb") as file:
+        file.write(b"".join(encoded))
+    np.save(os.path.join(entry_dir, f"{index}.offsets.npy"), offsets)
+
+
+# Distinct values of a text column, followed by None for the missing code
+def _read_vocabulary(entry_dir, index):
+    with open(os.path.join(entry_dir, f"{index}.txt"), "rb") as file:
+        blob = file.read()
+    offsets = np.load(os.path.join(entry_dir, f"{index}.offsets.npy")).tolist()
+    vocabulary = [
+        blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])
+    ]
+    return np.array(vocabulary + [None], dtype=object)
+
+
+def _sha1(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,133 @@
+import os
+from collections import OrderedDict
+
+from mtgaseer.ingest import parse_files
+
+
+#######################################################
+# DATASET STORE
+#######################################################
+
+# Default number of parsed files kept in memory at the same time
+DEFAULT_MAX_DATASETS = 64
+
+
+# Keeps the parsed (and cleaned) card rating files in memory, so switching
+# between the overall data and the archetypes is a dictionary lookup instead
+# of a disk read. Datasets are registered by key (None for the overall file,
+# the color code like "WU" for an archetype, or any other hashable key such as
+# (set, date, code) for multi-set history folders) and parsed by `loader`.
+# The cache is bounded (least recently used files are dropped first) and a
+# file is parsed again only when its modification time or size changes.
+class DatasetStore:
+    def __init__(self, loader, max_datasets=DEFAULT_MAX_DATASETS):
+        self.loader = loader
+        self.max_datasets = max_datasets
+        self._paths = {}  # key -> file path
+        self._cache = OrderedDict()  # file path -> (signature, data, derived)
+
+    # Register (or re-point) the file used for a key
+    def register(self, key, file_path):
+        self._paths[key] = file_path
+
+    # Register several keys at once from a {key: file_path} mapping
+    def register_many(self, paths):
+        for key, file_path in paths.items():
+            self.register(key, file_path)
+
+    # Forget every key (parsed files stay cached until evicted)
+    def unregister_all(self):
+        self._paths.clear()
+
+    def keys(self):
+        return list(self._paths)
+
+    def path(self, key):
+        return self._paths[key]
+
+    def __contains__(self, key):
+        return key in self._paths
+
+    # Return the cleaned data for a key, parsing the file only when needed.
+    # Raises KeyError for unknown keys and FileNotFoundError for missing files.
+    def get(self, key):
+        return self._entry(key)[1]
+
+    # Return a structure built from a dataset (search index, sort keys, ...),
+    # built once with `build(data)` and dropped together with the dataset
+    def derived(self, key, name, build):
+        _, data, derived = self._entry(key)
+        if name not in derived:
+            derived[name] = build(data)
+        return derived[name]
+
+    # Drop a derived structure from every cached dataset (e.g. one built with
+    # a setting that changed since)
+    def drop_derived(self, name):
+        for _, _, derived in self._cache.values():
+            derived.pop(name, None)
+
+    # Parse every registered file (or only the given keys) up front, `workers`
+    # files at the same time (see ingest.parse_files for `progress`).
+    # Missing files are skipped, so they only fail when actually requested.
+    def preload(self, keys=None, workers=1, progress=None):
+        pending = self.pending(keys)
+        jobs = {key: (self.loader, self._paths[key]) for key in pending}
+        results, errors = parse_files(jobs, workers, progress)
+        for key, data in results.items():
+            self.put(key, data, pending[key])
+        for error in errors.values():
+            if not isinstance(error, FileNotFoundError):
+                raise error
+
+    # Signatures of the registered files (or of the given keys) that are not
+    # parsed yet or changed since, by key. Missing files are left out.
+    def pending(self, keys=None):
+        pending = {}
+        for key in self._paths if keys is None else keys:
+            file_path = self._paths[key]
+            try:
+                signature = _file_signature(file_path)
+            except FileNotFoundError:
+                continue
+            cached = self._cache.get(file_path)
+            if cached is None or cached[0] != signature:
+                pending[key] = signature
+        return pending
+
+    # Store data parsed elsewhere (by a pool of workers, ...) for a key, with
+    # the signature its file had before it was parsed
+    def put(self, key, data, signature):
+        self._put(self._paths[key], signature, data)
+
+    # Drop cached data for one key, or everything when no key is given
+    def invalidate(self, key=None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self._paths.get(key), None)
+
+    def _entry(self, key):
+        file_path = self._paths[key]
+        signature = _file_signature(file_path)
+
+        cached = self._cache.get(file_path)
+        if cached is not None and cached[0] == signature:
+            self._cache.move_to_end(file_path)
+            return cached
+
+        data = self.loader(file_path)
+        return self._put(file_path, signature, data)
+
+    def _put(self, file_path, signature, data):
+        entry = self._cache[file_path] = (signature, data, {})
+        self._cache.move_to_end(file_path)
+        while len(self._cache) > self.max_datasets:
+            self._cache.popitem(last=False)
+        return entry
+
+
+# Cheap change detection for a file: modification time and size
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
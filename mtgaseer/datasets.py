@@ -0,0 +1,45 @@
+from mtgaseer.cleaning import read_card_ratings
+from mtgaseer.columnar_cache import ColumnarCache
+from mtgaseer.dataset_store import DatasetStore
+
+
+#######################################################
+# 17LANDS FILES AND ARCHETYPES
+#######################################################
+
+# Two-color archetypes that have their own card ratings file
+ARCHETYPE_CODES = ["WU", "WB", "WR", "WG", "UB", "UR", "UG", "BR", "BG", "RG"]
+
+# Mapping from archetype codes to the names used in the colors file
+ARCHETYPE_NAMES = {
+    "WU": "Azorius (WU)",
+    "WB": "Orzhov (WB)",
+    "WR": "Boros (RW)",
+    "WG": "Selesnya (GW)",
+    "UB": "Dimir (UB)",
+    "UR": "Izzet (UR)",
+    "UG": "Simic (GU)",
+    "BR": "Rakdos (BR)",
+    "BG": "Golgari (BG)",
+    "RG": "Gruul (RG)",
+}
+
+
+# Function to create a dataset store for the card ratings files of a snapshot
+# (see catalog.py): the overall file under the None key and the archetype
+# files under their color code. Nothing is parsed until it is requested.
+# Unless disabled, cleaned files are kept in the columnar cache so later
+# starts skip parsing.
+def create_dataset_store(catalog, snapshot, loader=read_card_ratings, use_cache=True):
+    if use_cache:
+        loader = ColumnarCache(loader)
+    dataset_store = DatasetStore(loader)
+    select_snapshot(dataset_store, catalog, snapshot)
+    return dataset_store
+
+
+# Function to point the keys of a dataset store to the files of another
+# snapshot (files of snapshots seen before stay in the store's cache)
+def select_snapshot(dataset_store, catalog, snapshot):
+    dataset_store.unregister_all()
+    dataset_store.register_many(catalog.card_ratings_files(snapshot))
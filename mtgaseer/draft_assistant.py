@@ -0,0 +1,51 @@
+import math
+
+import pandas as pd
+
+
+#######################################################
+# LIVE DRAFT PACK RANKING
+#######################################################
+
+# Stats shown for each card of a pack; the first one ranks the pack. The rank
+# column comes from ranking.with_ranks (precomputed for the whole table).
+DRAFT_STATS = ["GIH WR", "GIH WR Rank", "IWD", "ALSA"]
+
+
+# Function to read the MTG Arena card ids (the numbers used in Player.log)
+# from a 17lands "cards.csv" export, as a {card id: card name} dictionary
+def read_card_ids(file_path):
+    cards = pd.read_csv(file_path, usecols=["id", "name"], encoding="utf-8-sig")
+    cards = cards.dropna()
+    return dict(zip(cards["id"].astype(int), cards["name"].str.strip()))
+
+
+# Function to precompute the {card id: (name, GIH WR, rank, IWD, ALSA)} map of
+# one card ratings table, so ranking a pack needs no DataFrame work at all.
+# Cards of the table without a known id are left out.
+def build_stat_map(data, card_ids):
+    stats_by_name = dict(
+        zip(data["Name"], zip(*(data[stat].astype(float) for stat in DRAFT_STATS)))
+    )
+    return {
+        card_id: (name,) + stats_by_name[name]
+        for card_id, name in card_ids.items()
+        if name in stats_by_name
+    }
+
+
+# Function to rank the cards of a pack with a precomputed stat map. Returns
+# (name, GIH WR, rank, IWD, ALSA) tuples, best GIH WR first and missing stats last.
+# Unknown ids are kept (as "Card #id") so the pack is always complete.
+def rank_pack(stat_map, card_ids):
+    missing = (math.nan,) * len(DRAFT_STATS)
+    ranked = [
+        stat_map.get(card_id, (f"Card #{card_id}",) + missing) for card_id in card_ids
+    ]
+    ranked.sort(key=_rank_key)
+    return ranked
+
+
+def _rank_key(row):
+    ranking_stat = row[1]
+    return (1, 0.0) if math.isnan(ranking_stat) else (0, -ranking_stat)
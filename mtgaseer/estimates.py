@@ -0,0 +1,99 @@
+import numpy as np
+
+
+#######################################################
+# SAMPLE-SIZE AWARE WIN RATES (SHRINKAGE AND INTERVALS)
+#######################################################
+
+# Win rate columns and the game counts they are measured on
+WIN_RATE_COUNTS = {
+    "GP WR": "# GP",
+    "OH WR": "# OH",
+    "GD WR": "# GD",
+    "GIH WR": "# GIH",
+    "GNS WR": "# GNS",
+}
+
+# Games at the average win rate added to every card by default (prior weight)
+DEFAULT_PRIOR_GAMES = 200
+
+# z value of the confidence intervals (1.96 for 95%)
+DEFAULT_Z = 1.96
+
+
+# The functions below take win rates (in %, NaN when 17lands hides them) and
+# game counts as arrays of the same shape: cards on the first axis, and any
+# other axes (archetypes, dates, ...) after it, so a whole card × archetype
+# stack is computed in one pass.
+
+
+# Function to get the average win rate of each column (the archetype average),
+# weighted by games; cards without a win rate are left out
+def prior_win_rates(rates, counts):
+    rates, counts, known = _prepare(rates, counts)
+    games = np.where(known, counts, 0).sum(axis=0)
+    wins = np.where(known, rates * counts, 0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return wins / games
+
+
+# Function to shrink win rates towards the average (Beta-binomial / Bayesian
+# average): every card gets `prior_games` extra games at the prior win rate,
+# so cards with few games stay close to the average while cards with many
+# games keep their own win rate. Cards whose win rate is hidden get the prior.
+def shrunk_win_rates(rates, counts, prior_games=DEFAULT_PRIOR_GAMES, prior=None):
+    rates, counts, known = _prepare(rates, counts)
+    if prior is None:
+        prior = prior_win_rates(rates, counts)
+    games = np.where(known, counts, 0)
+    wins = np.where(known, rates * counts, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shrunk = (wins + prior * prior_games) / (games + prior_games)
+    return shrunk.astype(np.float32)
+
+
+# Function to get the Wilson score interval of win rates, returns the low and
+# high bounds (NaN for cards without games or without a win rate)
+def wilson_intervals(rates, counts, z=DEFAULT_Z):
+    rates, counts, known = _prepare(rates, counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = rates / 100
+        z2n = z * z / counts
+        center = (rate + z2n / 2) / (1 + z2n)
+        spread = z * np.sqrt(rate * (1 - rate) / counts + z2n / (4 * counts))
+        spread /= 1 + z2n
+    low = np.where(known, 100 * (center - spread), np.nan)
+    high = np.where(known, 100 * (center + spread), np.nan)
+    return low.astype(np.float32), high.astype(np.float32)
+
+
+# Function to get the names of the estimate columns of a win rate column
+def estimate_columns(stat):
+    return {
+        "shrunk": f"{stat} Shrunk",
+        "low": f"{stat} Low",
+        "high": f"{stat} High",
+    }
+
+
+# Function to add the shrunk win rate and the interval bounds of a win rate
+# column to a card ratings table
+def with_estimates(data, stat="GIH WR", prior_games=DEFAULT_PRIOR_GAMES, z=DEFAULT_Z):
+    rates = data[stat].to_numpy(dtype=np.float64)
+    counts = data[WIN_RATE_COUNTS[stat]].to_numpy(dtype=np.float64)
+    low, high = wilson_intervals(rates, counts, z)
+    names = estimate_columns(stat)
+    return data.assign(
+        **{
+            names["shrunk"]: shrunk_win_rates(rates, counts, prior_games),
+            names["low"]: low,
+            names["high"]: high,
+        }
+    )
+
+
+# Arrays as float64, missing counts as 0 games, and where a win rate is known
+def _prepare(rates, counts):
+    rates = np.asarray(rates, dtype=np.float64)
+    counts = np.nan_to_num(np.asarray(counts, dtype=np.float64))
+    return rates, counts, ~np.isnan(rates) & (counts > 0)
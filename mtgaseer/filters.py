@@ -0,0 +1,103 @@
+import numpy as np
+
+from mtgaseer.cleaning import MISSING_TEXT
+
+
+#######################################################
+# CARD FILTERS (PRECOMPUTED MASKS PER COLOR AND RARITY)
+#######################################################
+
+# Color symbols that can be filtered on ("C" is colorless)
+COLOR_SYMBOLS = ["W", "U", "B", "R", "G", "C"]
+
+# Rarity codes of the 17lands exports (B is the bonus sheet)
+RARITY_CODES = ["C", "U", "R", "M", "B"]
+
+# Stats that can be filtered on with a range
+RANGE_STATS = ["GIH WR", "# GIH", "GP WR", "# GP", "IWD", "ALSA", "ATA", "% GP"]
+
+# How the selected colors are matched:
+# "any": the card has at least one of the colors (B or R)
+# "within": every color of the card is selected (playable in a B/R deck)
+COLOR_MATCHES = ["any", "within"]
+
+
+# Filters the rows of one card ratings table. A boolean mask is built once per
+# color symbol and per rarity, and the range stats are kept as float arrays,
+# all in the row order of the table. A query (colors, rarities, ranges) is then
+# answered by OR-ing and AND-ing those arrays, without touching the DataFrame.
+class CardFilter:
+    def __init__(self, data):
+        self.size = len(data)
+
+        colors = _text_column(data, "Color")
+        self._color_masks = {}  # symbol -> row has the color
+        for symbol in COLOR_SYMBOLS[:-1]:
+            self._color_masks[symbol] = np.char.find(colors, symbol) >= 0
+        colored = np.logical_or.reduce(list(self._color_masks.values()))
+        self._color_masks["C"] = ~colored
+
+        rarities = _text_column(data, "Rarity")
+        self._rarity_masks = {code: rarities == code for code in RARITY_CODES}
+
+        # Stats missing from the table are all NaN (no card in any range)
+        self._values = {
+            stat: (
+                data[stat].to_numpy(dtype=np.float64)
+                if stat in data
+                else np.full(self.size, np.nan)
+            )
+            for stat in RANGE_STATS
+        }
+
+    # Build the filter of a card ratings table (for DatasetStore.derived)
+    @classmethod
+    def from_data(cls, data):
+        return cls(data)
+
+    # Function to get the mask of the rows matching every given condition:
+    # - colors: color symbols matched as `color_match` says (None: any color)
+    # - rarities: rarity codes, a card matches one of them (None: any rarity)
+    # - ranges: (stat, low, high) triples, with None for an open bound; cards
+    #   without a value for the stat never match
+    def mask(self, colors=None, rarities=None, ranges=(), color_match="any"):
+        mask = np.ones(self.size, dtype=bool)
+        if colors is not None:
+            mask &= self._colors_mask(colors, color_match)
+        if rarities is not None:
+            mask &= _any_of(self._rarity_masks, rarities, self.size)
+        for stat, low, high in ranges:
+            values = self._values[stat]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+
+    # Function to keep the rows (positions, like a name search result) matching
+    # the conditions of `mask`
+    def apply(self, rows, **conditions):
+        return rows[self.mask(**conditions)[rows]]
+
+    def _colors_mask(self, colors, color_match):
+        if color_match == "any":
+            return _any_of(self._color_masks, colors, self.size)
+        if color_match == "within":
+            excluded = [s for s in COLOR_SYMBOLS[:-1] if s not in colors]
+            return ~_any_of(self._color_masks, excluded, self.size)
+        raise ValueError(f"Unknown color match: {color_match}")
+
+
+# Function to OR the masks of some keys (all False when there is none)
+def _any_of(masks, keys, size):
+    mask = np.zeros(size, dtype=bool)
+    for key in keys:
+        mask |= masks[key]
+    return mask
+
+
+# Text column as a fixed width string array ("-" for missing values)
+def _text_column(data, column):
+    if column not in data:
+        return np.full(len(data), MISSING_TEXT)
+    return data[column].fillna(MISSING_TEXT).to_numpy(dtype=str)
@@ -0,0 +1,488 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from mtgaseer.card_registry import CardRegistry
+from mtgaseer.cleaning import (
+    AVERAGE_COLUMNS,
+    CARD_RATINGS_COLUMNS,
+    COUNT_COLUMNS,
+    MISSING_TEXT,
+    PERCENTAGE_COLUMNS,
+    POINTS_COLUMNS,
+    TEXT_COLUMNS,
+)
+from mtgaseer.datasets import ARCHETYPE_CODES, ARCHETYPE_NAMES
+from mtgaseer.perf import span
+from mtgaseer.synergy import (
+    SYNERGY_KINDS,
+    SYNERGY_MIN_GAMES,
+    PairCounts,
+    SynergyMatrix,
+)
+
+
+#######################################################
+# CARD RATINGS FROM RAW 17LANDS GAME DATA (STREAMED)
+#######################################################
+
+# Games read at once from a game_data file (memory use grows with it, never
+# with the size of the file)
+GAME_DATA_CHUNK_ROWS = 20000
+
+# Bytes of an uncompressed game_data file counted as one shard (see
+# file_shards), so one large file can be spread over several processes
+GAME_DATA_SHARD_BYTES = 256 * 1024 * 1024
+
+# Games counted for every card, as (count column, win rate column): played
+# (in the deck), in the opening hand, drawn, in hand (opening hand or drawn)
+# and not seen (in the deck, never in hand)
+GAME_KINDS = [
+    ("# GP", "GP WR"),
+    ("# OH", "OH WR"),
+    ("# GD", "GD WR"),
+    ("# GIH", "GIH WR"),
+    ("# GNS", "GNS WR"),
+]
+
+# Prefixes of the per-card columns of a game_data file (copies of the card)
+_DECK = "deck_"
+_SIDEBOARD = "sideboard_"
+_OPENING_HAND = "opening_hand_"
+_DRAWN = "drawn_"
+_CARD_PREFIXES = [_DECK, _SIDEBOARD, _OPENING_HAND, _DRAWN]
+
+# Columns of a game_data file used for the cuts and the deck groups
+_GAME_COLUMNS = ["rank", "game_time", "main_colors", "won"]
+
+# Card groups: overall (None), then one per archetype (the deck main colors)
+_GROUPS = [None] + ARCHETYPE_CODES
+_GROUP_INDEX = {code: index for index, code in enumerate(_GROUPS) if code}
+
+# Rarities of the 17lands cards.csv export -> codes of the card ratings files
+_RARITY_CODES = {"common": "C", "uncommon": "U", "rare": "R", "mythic": "M"}
+
+
+# Builds card ratings tables from the public 17lands game_data files (one row
+# per game, one column per card and per deck/sideboard/opening_hand/drawn).
+# The files are read in chunks of `chunk_rows` games and only the counts are
+# kept, in NumPy counters indexed by the card ids of a CardRegistry: games and
+# wins of each card for each GAME_KINDS, overall and per archetype. Files
+# larger than the memory are fine, and several files (or sets) add up.
+#
+# Only the games matching the cut are counted: `ranks` (e.g. ["gold",
+# "platinum"], any rank when None) and a date window on the game time
+# (`start_date` / `end_date`, "YYYY-MM-DD", both included). With `synergy`,
+# the games and wins of every pair of cards played together are counted too
+# (see PairCounts and synergy_matrix).
+class GameDataAggregator:
+    def __init__(
+        self,
+        ranks=None,
+        start_date=None,
+        end_date=None,
+        registry=None,
+        synergy=False,
+    ):
+        self.ranks = None if ranks is None else [rank.lower() for rank in ranks]
+        self.start_date = start_date
+        self.end_date = end_date
+        self.registry = CardRegistry() if registry is None else registry
+
+        self.last_date = None  # Date of the latest game counted
+        # [group, game kind, games / wins, card id]
+        self._cards = np.zeros((len(_GROUPS), len(GAME_KINDS), 2, 0), np.int64)
+        # [group, card id]: games with the card in the pool (deck or sideboard)
+        self._pool = np.zeros((len(_GROUPS), 0), np.int64)
+        # [group, games / wins]: games of each deck group
+        self._decks = np.zeros((len(_GROUPS), 2), np.int64)
+        # Pairs of cards played together (overall only), None when not counted
+        self.pairs = PairCounts() if synergy else None
+
+    # Number of games counted (after the cut)
+    @property
+    def games(self):
+        return int(self._decks[0, 0])
+
+    # Function to count the games of a game_data file (.csv or .csv.gz), one
+    # chunk at a time; `progress(games read)` is called after each chunk. With
+    # a `byte_range` (start, end) from file_shards, only the games of these
+    # bytes of an uncompressed file are counted.
+    def add_file(
+        self,
+        file_path,
+        chunk_rows=GAME_DATA_CHUNK_ROWS,
+        progress=None,
+        byte_range=None,
+    ):
+        header = pd.read_csv(file_path, nrows=0).columns
+        card_names = [col[len(_DECK) :] for col in header if col.startswith(_DECK)]
+        card_columns = [
+            prefix + name
+            for prefix in _CARD_PREFIXES
+            for name in card_names
+            if prefix + name in header
+        ]
+        source, options = file_path, {}
+        if byte_range is not None:
+            source = io.BufferedReader(_ByteRangeReader(file_path, *byte_range))
+            options = {"header": None, "names": list(header)}
+        try:
+            chunks = pd.read_csv(
+                source,
+                usecols=[col for col in _GAME_COLUMNS if col in header] + card_columns,
+                dtype={col: np.uint8 for col in card_columns},
+                chunksize=chunk_rows,
+                **options,
+            )
+            games_read = 0
+            for chunk in chunks:
+                with span("game_data.chunk"):
+                    self.add_chunk(chunk, card_names)
+                games_read += len(chunk)
+                if progress is not None:
+                    progress(games_read)
+        finally:
+            if byte_range is not None:
+                source.close()
+        return games_read
+
+    # Function to count the games of a DataFrame in the game_data layout, for
+    # the cards given by name
+    def add_chunk(self, chunk, card_names):
+        chunk = chunk[self._in_cut(chunk)]
+        if not len(chunk):
+            return
+        card_ids = self.registry.ids(card_names)
+        self._reserve(len(self.registry))
+
+        # Deck group of every game (overall, and its archetype if any)
+        groups = np.zeros((len(chunk), len(_GROUPS)), dtype=np.float32)
+        groups[:, 0] = 1
+        if "main_colors" in chunk:
+            group_index = chunk["main_colors"].map(_GROUP_INDEX).to_numpy()
+            has_group = ~pd.isna(group_index)
+            groups[has_group, group_index[has_group].astype(np.intp)] = 1
+        won = _won(chunk["won"])
+        won_groups = groups * won[:, None]
+        self._decks[:, 0] += np.rint(groups.sum(axis=0)).astype(np.int64)
+        self._decks[:, 1] += np.rint(won_groups.sum(axis=0)).astype(np.int64)
+
+        def present(prefix):
+            return _card_copies(chunk, prefix, card_names) > 0
+
+        deck = present(_DECK)
+        opening_hand = present(_OPENING_HAND)
+        drawn = present(_DRAWN)
+        in_hand = opening_hand | drawn
+        kinds = [deck, opening_hand, drawn, in_hand, deck & ~in_hand]
+
+        # Games and wins per group and card are matrix products of the group
+        # (or won group) indicators with the card indicators
+        for kind, present_cards in enumerate(kinds):
+            present_cards = present_cards.astype(np.float32)
+            for result, weights in enumerate([groups, won_groups]):
+                counts = np.rint(weights.T @ present_cards).astype(np.int64)
+                self._cards[:, kind, result, card_ids] += counts
+        pool = (deck | present(_SIDEBOARD)).astype(np.float32)
+        self._pool[:, card_ids] += np.rint(groups.T @ pool).astype(np.int64)
+        if self.pairs is not None:
+            with span("game_data.pairs"):
+                self.pairs.add(card_ids, [deck, in_hand], won)
+
+        if "game_time" in chunk and chunk["game_time"].notna().any():
+            last_date = chunk["game_time"].dropna().astype(str).str[:10].max()
+            self.last_date = max(self.last_date or last_date, last_date)
+
+    # Function to get the card ratings table of a group (None: overall, or an
+    # archetype code), cleaned like read_card_ratings returns it. Cards never
+    # in a pool of the group are left out; `card_info` (see read_card_info)
+    # gives the color and rarity of the cards. Draft stats (# Seen, ALSA, ...)
+    # are not in game data and stay empty.
+    def card_ratings(self, group=None, card_info=None):
+        self._reserve(len(self.registry))  # Cards registered by others
+        index = _GROUPS.index(group)
+        counts = self._cards[index]
+        pool = self._pool[index]
+        kept = pool > 0
+        names = self.registry.names()[kept]
+
+        data = pd.DataFrame({"Name": names})
+        data["Color"], data["Rarity"] = _card_info_columns(names, card_info)
+        for col in ["# Seen", "ALSA", "# Picked", "ATA"]:
+            data[col] = np.float32(np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for kind, (count_column, win_rate_column) in enumerate(GAME_KINDS):
+                games, wins = counts[kind, 0, kept], counts[kind, 1, kept]
+                data[count_column] = games.astype(np.int32)
+                data[win_rate_column] = (100 * wins / games).astype(np.float32)
+            data["% GP"] = (100 * counts[0, 0, kept] / pool[kept]).astype(np.float32)
+        data["IWD"] = data["GIH WR"] - data["GNS WR"]
+        return data[CARD_RATINGS_COLUMNS].sort_values("Name", ignore_index=True)
+
+    # Function to get the win rates of the deck groups, like read_color_ratings
+    # returns a colors file (archetypes, then "All Decks")
+    def color_ratings(self):
+        rows = []
+        for index, code in enumerate(_GROUPS):
+            games, wins = self._decks[index]
+            if games:
+                name = ARCHETYPE_NAMES[code] if code else "All Decks"
+                rows.append((name, wins, games, np.float32(100 * wins / games)))
+        return pd.DataFrame(rows, columns=["Color", "Wins", "# Games", "Win Rate"])
+
+    # Function to add the counts of another aggregator (e.g. the one of
+    # another file or shard, counted in another process), matching the cards
+    # by name. Merging is associative and commutative: the partial counts of
+    # the shards give the same tables in any order.
+    def merge(self, other):
+        card_ids = self.registry.ids(other.registry.names())
+        self._reserve(len(self.registry))
+        other._reserve(len(other.registry))
+        self._cards[..., card_ids] += other._cards
+        self._pool[:, card_ids] += other._pool
+        self._decks += other._decks
+        if self.pairs is not None and other.pairs is not None:
+            self.pairs.merge(other.pairs, card_ids)
+        if other.last_date:
+            self.last_date = max(self.last_date or other.last_date, other.last_date)
+        return self
+
+    # Function to save the counts to a compressed .npz file (card names and
+    # counters, not the cut), written atomically
+    def save(self, file_path):
+        self._reserve(len(self.registry))
+        pairs = {}
+        if self.pairs is not None:
+            first_ids, second_ids, pairs["pair_counts"] = self.pairs.pairs()
+            pairs["pair_ids"] = np.stack([first_ids, second_ids]).astype(np.int32)
+        temp_path = file_path + ".tmp"
+        with open(temp_path, "wb") as partial_file:
+            np.savez_compressed(
+                partial_file,
+                names=self.registry.names().astype(str),
+                cards=self._cards,
+                pool=self._pool,
+                decks=self._decks,
+                last_date=np.array(self.last_date or ""),
+                **pairs,
+            )
+        os.replace(temp_path, file_path)
+
+    # Function to load counts saved with `save`, as an aggregator to merge
+    @classmethod
+    def load(cls, file_path):
+        aggregator = cls()
+        with np.load(file_path) as partial:
+            card_ids = aggregator.registry.ids(partial["names"].astype(object))
+            aggregator._reserve(len(aggregator.registry))
+            aggregator._cards[..., card_ids] = partial["cards"]
+            aggregator._pool[:, card_ids] = partial["pool"]
+            aggregator._decks[:] = partial["decks"]
+            aggregator.last_date = str(partial["last_date"]) or None
+            if "pair_ids" in partial:
+                first_ids, second_ids = card_ids[partial["pair_ids"]]
+                aggregator.pairs = PairCounts()
+                aggregator.pairs.add_pairs(
+                    first_ids, second_ids, partial["pair_counts"]
+                )
+        return aggregator
+
+    # Function to get the best partners of every card (see SynergyMatrix),
+    # from the pairs played together at least `min_games` times. The lift of a
+    # pair is over the GP WR (both in the deck) or GIH WR (both in hand) of the
+    # two cards, overall.
+    def synergy_matrix(self, min_games=SYNERGY_MIN_GAMES):
+        if self.pairs is None:
+            raise ValueError("Card pairs were not counted (synergy=False)")
+        self._reserve(len(self.registry))
+        count_columns = [count_column for count_column, _ in GAME_KINDS]
+        kinds = [count_columns.index(f"# {kind}") for kind in SYNERGY_KINDS]
+        first_ids, second_ids, counts = self.pairs.pairs()
+        return SynergyMatrix.from_counts(
+            self.registry.names(),
+            first_ids,
+            second_ids,
+            counts,
+            self._cards[0, kinds],
+            min_games,
+        )
+
+    # Keep only the games of the cut (rank and date window)
+    def _in_cut(self, chunk):
+        keep = np.ones(len(chunk), dtype=bool)
+        if self.ranks is not None and "rank" in chunk:
+            keep &= chunk["rank"].astype(str).str.lower().isin(self.ranks).to_numpy()
+        if (self.start_date or self.end_date) and "game_time" in chunk:
+            dates = chunk["game_time"].astype(str).str[:10]
+            if self.start_date:
+                keep &= (dates >= self.start_date).to_numpy()
+            if self.end_date:
+                keep &= (dates <= self.end_date).to_numpy()
+        return keep
+
+    # Grow the counters along the card axis for `count` cards
+    def _reserve(self, count):
+        missing = count - self._pool.shape[1]
+        if missing > 0:
+            self._cards = np.pad(self._cards, ((0, 0), (0, 0), (0, 0), (0, missing)))
+            self._pool = np.pad(self._pool, ((0, 0), (0, missing)))
+
+
+# Function to split an uncompressed game_data file into byte ranges of about
+# `shard_bytes`, starting and ending on line boundaries after the header, for
+# GameDataAggregator.add_file. Returns [None] (the whole file) for compressed
+# or small files.
+def file_shards(file_path, shard_bytes=GAME_DATA_SHARD_BYTES):
+    if not file_path.lower().endswith(".csv"):
+        return [None]
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as csv_file:
+        csv_file.readline()
+        offsets = [csv_file.tell()]
+        if size - offsets[0] <= shard_bytes:
+            return [None]
+        for offset in range(offsets[0] + shard_bytes, size, shard_bytes):
+            offsets.append(_line_start(csv_file, offset))
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if start < end]
+
+
+# Function to read the colors and rarities of the cards from a 17lands
+# "cards.csv" export, as a DataFrame indexed by card name (only the cards of
+# one set when `set_code` is given)
+def read_card_info(file_path, set_code=None):
+    cards = pd.read_csv(
+        file_path,
+        usecols=["expansion", "name", "rarity", "color_identity"],
+        encoding="utf-8-sig",
+    )
+    if set_code:
+        cards = cards[cards["expansion"].str.upper() == set_code.upper()]
+    cards = cards.dropna(subset=["name"]).drop_duplicates("name", keep="last")
+    return pd.DataFrame(
+        {
+            "Color": cards["color_identity"].to_numpy(),
+            "Rarity": cards["rarity"].str.lower().map(_RARITY_CODES).to_numpy(),
+        },
+        index=cards["name"].str.strip(),
+    )
+
+
+# Function to write the card ratings of an aggregator (overall and every
+# archetype with games) and its colors file, named and formatted like the
+# 17lands exports so the app and the reports read them like any snapshot.
+# When the aggregator counted the card pairs, their synergy matrix is written
+# next to them ("synergy-....npz"). Returns the paths of the written files.
+def write_game_data_ratings(
+    aggregator,
+    output_dir,
+    set_code,
+    date,
+    card_info=None,
+    synergy_min_games=SYNERGY_MIN_GAMES,
+):
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = f"{set_code}-{date}" if set_code else date
+    written = []
+    for group in _GROUPS:
+        data = aggregator.card_ratings(group, card_info)
+        if not len(data) or not data["# GP"].any():
+            continue
+        suffix = f"({group})" if group else ""
+        path = os.path.join(output_dir, f"card-ratings-{prefix}{suffix}.csv")
+        _export_table(data).to_csv(path, index=False, encoding="utf-8-sig")
+        written.append(path)
+
+    colors = aggregator.color_ratings()
+    if len(colors):
+        path = os.path.join(output_dir, f"colors-{prefix}.csv")
+        _export_table(colors).to_csv(path, index=False, encoding="utf-8-sig")
+        written.append(path)
+
+    if aggregator.pairs is not None:
+        path = os.path.join(output_dir, f"synergy-{prefix}.npz")
+        aggregator.synergy_matrix(synergy_min_games).save(path)
+        written.append(path)
+    return written
+
+
+# Table with the values written like in the 17lands exports ("59.50%",
+# "11.9pp", blank when missing)
+def _export_table(data):
+    exported = data.copy()
+    for col in data.columns:
+        if col in TEXT_COLUMNS:
+            exported[col] = data[col].replace(MISSING_TEXT, "")
+        elif col in PERCENTAGE_COLUMNS or col == "Win Rate":
+            exported[col] = _formatted(data[col], "{:.2f}%")
+        elif col in POINTS_COLUMNS:
+            exported[col] = _formatted(data[col], "{:.1f}pp")
+        elif col in AVERAGE_COLUMNS:
+            exported[col] = _formatted(data[col], "{:.2f}")
+        elif col in COUNT_COLUMNS or col in ["Wins", "# Games"]:
+            exported[col] = _formatted(data[col], "{:.0f}")
+    return exported
+
+
+def _formatted(values, text_format):
+    return values.map(lambda value: "" if pd.isna(value) else text_format.format(value))
+
+
+# Offset of the first line starting at or after `offset`
+def _line_start(csv_file, offset):
+    csv_file.seek(offset - 1)
+    csv_file.readline()
+    return csv_file.tell()
+
+
+# Raw binary stream over the bytes [start, end) of a file
+class _ByteRangeReader(io.RawIOBase):
+    def __init__(self, file_path, start, end):
+        self._file = open(file_path, "rb")
+        self._file.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._left -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+# Copies of some cards in every game of a chunk (0 for missing columns)
+def _card_copies(chunk, prefix, card_names):
+    columns = [prefix + name for name in card_names]
+    if all(col in chunk for col in columns):
+        return chunk[columns].to_numpy()
+    copies = np.zeros((len(chunk), len(card_names)), dtype=np.uint8)
+    for position, col in enumerate(columns):
+        if col in chunk:
+            copies[:, position] = chunk[col].to_numpy()
+    return copies
+
+
+# Game results as a boolean array ("True"/"False" texts or booleans)
+def _won(values):
+    if pd.api.types.is_bool_dtype(values):
+        return values.to_numpy()
+    return values.astype(str).str.strip().str.lower().isin(["true", "1"]).to_numpy()
+
+
+# Color and rarity columns of some cards ("-" when unknown)
+def _card_info_columns(names, card_info):
+    if card_info is None:
+        return MISSING_TEXT, MISSING_TEXT
+    info = card_info.reindex(names).fillna(MISSING_TEXT)
+    return info["Color"].to_numpy(), info["Rarity"].to_numpy()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mtgaseer.columnar_cache import CACHE_DIR_NAME
+from mtgaseer.game_data import (
+    GAME_DATA_CHUNK_ROWS,
+    GAME_DATA_SHARD_BYTES,
+    GameDataAggregator,
+    file_shards,
+)
+from mtgaseer.ingest import DEFAULT_INGEST_WORKERS
+
+
+#######################################################
+# GAME DATA MAP-REDUCE (SHARDS COUNTED IN PROCESSES)
+#######################################################
+
+# Folder of the partial counts of the shards, in the cache of the output folder
+GAME_DATA_CHECKPOINT_DIR_NAME = "game-data"
+
+# Bump when the counts of a shard change for the same input, so older
+# checkpoints are not reused
+_PARTIAL_VERSION = 1
+
+# Part of a game_data file counted by one worker: a byte range from
+# file_shards, or None for the whole file
+Shard = namedtuple("Shard", ["file_path", "byte_range"])
+
+
+# Function to split game_data files into shards: one per compressed or small
+# file, several per large uncompressed file
+def plan_shards(file_paths, shard_bytes=GAME_DATA_SHARD_BYTES):
+    return [
+        Shard(file_path, byte_range)
+        for file_path in file_paths
+        for byte_range in file_shards(file_path, shard_bytes)
+    ]
+
+
+# Function to count the games of many game_data files with a pool of
+# processes. Every shard is counted by a worker into its own small
+# GameDataAggregator (map), and the partial counts are merged in the calling
+# process as they arrive (reduce), so the result does not depend on the order
+# of completion. With one worker the shards are counted one after the other in
+# the calling process.
+#
+# With a `checkpoint_dir`, the partial counts of every shard are saved there
+# as soon as the shard is done, keyed by the file (path, size, modification
+# time), the byte range and the cut. An interrupted run started again only
+# counts the shards left, and adding a file to a cut only counts that file.
+#
+# With `synergy` the card pairs are counted too. `progress(done, total,
+# shard)` is called in the calling process after each shard. Returns the
+# merged GameDataAggregator.
+def aggregate_game_data(
+    file_paths,
+    ranks=None,
+    start_date=None,
+    end_date=None,
+    workers=DEFAULT_INGEST_WORKERS,
+    chunk_rows=GAME_DATA_CHUNK_ROWS,
+    shard_bytes=GAME_DATA_SHARD_BYTES,
+    checkpoint_dir=None,
+    progress=None,
+    synergy=False,
+):
+    cut = (ranks, start_date, end_date)
+    total = GameDataAggregator(*cut, synergy=synergy)
+    shards = plan_shards(file_paths, shard_bytes)
+    done = 0
+
+    def add(partial, shard):
+        nonlocal done
+        total.merge(partial)
+        done += 1
+        if progress is not None:
+            progress(done, len(shards), shard)
+
+    pending = []
+    for shard in shards:
+        partial_path = None
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            partial_name = _partial_name(shard, cut, synergy)
+            partial_path = os.path.join(checkpoint_dir, partial_name)
+        if partial_path is not None and os.path.exists(partial_path):
+            add(GameDataAggregator.load(partial_path), shard)
+        else:
+            pending.append((shard, partial_path))
+
+    if workers <= 1 or len(pending) <= 1:
+        for shard, partial_path in pending:
+            partial = _count_shard(shard, cut, synergy, chunk_rows, partial_path)
+            add(partial, shard)
+        return total
+
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(pending)))
+    try:
+        futures = {
+            executor.submit(
+                _count_shard, shard, cut, synergy, chunk_rows, partial_path
+            ): shard
+            for shard, partial_path in pending
+        }
+        for future in as_completed(futures):
+            add(future.result(), futures[future])
+    except BaseException:
+        # Shards already done are checkpointed, the others are not started
+        executor.shutdown(cancel_futures=True)
+        raise
+    executor.shutdown()
+    return total
+
+
+# Function to get the checkpoint folder of an output folder
+def checkpoint_dir_for(output_dir):
+    return os.path.join(output_dir, CACHE_DIR_NAME, GAME_DATA_CHECKPOINT_DIR_NAME)
+
+
+# Count the games of one shard (in a worker process) and save them
+def _count_shard(shard, cut, synergy, chunk_rows, partial_path=None):
+    partial = GameDataAggregator(*cut, synergy=synergy)
+    partial.add_file(shard.file_path, chunk_rows, byte_range=shard.byte_range)
+    if partial_path is not None:
+        partial.save(partial_path)
+    return partial
+
+
+# File name of the checkpoint of a shard
+def _partial_name(shard, cut, synergy):
+    stat = os.stat(shard.file_path)
+    key = [
+        _PARTIAL_VERSION,
+        os.path.abspath(shard.file_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        shard.byte_range,
+        cut,
+        synergy,
+    ]
+    digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+    return f"{digest}.npz"
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from mtgaseer.cleaning import read_color_ratings
+
+
+#######################################################
+# BULK INGEST (MANY FILES PARSED AT THE SAME TIME)
+#######################################################
+
+# Number of files parsed at the same time by default
+DEFAULT_INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+# Key of the colors file among the card ratings keys of a snapshot
+_COLORS_KEY = object()
+
+
+# Function to parse several files concurrently. `jobs` maps any key to a
+# (loader, file path) pair, and `progress(done, total, key)` is called in the
+# calling thread after each file. Threads are used by default (pandas parses
+# without holding the GIL); `use_processes` spreads the work over processes
+# instead, which needs picklable loaders. With one worker the files are parsed
+# one after the other in the calling thread, in the order of `jobs`.
+# Returns the parsed data and the OSErrors (missing files, ...) by key, both in
+# the order of `jobs`; other errors are raised.
+def parse_files(
+    jobs, workers=DEFAULT_INGEST_WORKERS, progress=None, use_processes=False
+):
+    results, errors = {}, {}
+    total = len(jobs)
+
+    if workers <= 1 or total <= 1:
+        for done, (key, (loader, file_path)) in enumerate(jobs.items(), 1):
+            try:
+                results[key] = loader(file_path)
+            except OSError as error:
+                errors[key] = error
+            if progress is not None:
+                progress(done, total, key)
+        return results, errors
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=min(workers, total)) as executor:
+        futures = {
+            executor.submit(loader, file_path): key
+            for key, (loader, file_path) in jobs.items()
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except OSError as error:
+                errors[key] = error
+            if progress is not None:
+                progress(done, total, key)
+
+    # Same order as the serial version, whatever the order of completion
+    results = {key: results[key] for key in jobs if key in results}
+    errors = {key: errors[key] for key in jobs if key in errors}
+    return results, errors
+
+
+# Function to load every file of a snapshot at once: the card ratings files
+# registered in the dataset store (or only the given keys) that are not parsed
+# yet, and the colors file. Missing card ratings files are skipped like in
+# DatasetStore.preload. Returns the color ratings table (None without a colors
+# file).
+def load_snapshot(
+    dataset_store,
+    colors_file=None,
+    keys=None,
+    workers=DEFAULT_INGEST_WORKERS,
+    progress=None,
+    use_processes=False,
+):
+    jobs, pending = snapshot_jobs(dataset_store, colors_file, keys)
+    results, errors = parse_files(jobs, workers, progress, use_processes)
+    return store_snapshot(dataset_store, pending, results, errors)
+
+
+# The two halves of load_snapshot, for callers that parse in another thread:
+# snapshot_jobs and store_snapshot use the dataset store and must run in the
+# thread owning it, only parse_files(jobs, ...) runs in between elsewhere.
+#
+# Function to get the parse jobs of a snapshot, and the signatures of the card
+# ratings files to parse (needed by store_snapshot)
+def snapshot_jobs(dataset_store, colors_file=None, keys=None):
+    pending = dataset_store.pending(keys)
+    jobs = {key: (dataset_store.loader, dataset_store.path(key)) for key in pending}
+    if colors_file is not None:
+        jobs[_COLORS_KEY] = (read_color_ratings, colors_file)
+    return jobs, pending
+
+
+# Function to store the parsed card ratings files in the dataset store, and
+# return the color ratings table (None without a colors file)
+def store_snapshot(dataset_store, pending, results, errors):
+    results = dict(results)
+    colors = results.pop(_COLORS_KEY, None)
+    for key, data in results.items():
+        dataset_store.put(key, data, pending[key])
+
+    for key, error in errors.items():
+        if key is _COLORS_KEY or not isinstance(error, FileNotFoundError):
+            raise error
+    return colors
@@ -0,0 +1,163 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+#######################################################
+# HOT PATH TIMINGS (SPANS AND HISTOGRAMS)
+#######################################################
+
+# Set to 1 to collect timings from the start
+PERF_ENV_VAR = "MTGASEER_PERF"
+
+# Set to a file path to collect timings and write them there when done
+PERF_FILE_ENV_VAR = "MTGASEER_PERF_FILE"
+
+# Durations kept per operation for the percentiles (the latest ones)
+DEFAULT_MAX_SAMPLES = 2000
+
+# Columns of the summary, in display order
+SUMMARY_COLUMNS = [
+    "Operation",
+    "Count",
+    "p50 (ms)",
+    "p95 (ms)",
+    "Max (ms)",
+    "Total (ms)",
+]
+
+
+# Collects the durations of named operations ("load.read_csv", "table.sort",
+# ...) from any thread. While disabled, `span()` returns a shared object that
+# does nothing, so instrumented code only pays one attribute check. Count,
+# total and max are exact; p50 and p95 are computed over the latest
+# `max_samples` durations of each operation.
+class PerfRecorder:
+    def __init__(self, enabled=False, max_samples=DEFAULT_MAX_SAMPLES):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._operations = {}  # name -> _Operation
+
+    # Context manager timing the code it wraps
+    def span(self, name):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    # Add the duration of an operation (in seconds)
+    def record(self, name, seconds):
+        with self._lock:
+            operation = self._operations.get(name)
+            if operation is None:
+                operation = self._operations[name] = _Operation(self.max_samples)
+            operation.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+
+    # Function to get the stats of every operation, slowest in total first,
+    # as rows of SUMMARY_COLUMNS (times in milliseconds)
+    def summary(self):
+        with self._lock:
+            operations = [
+                (name, *operation.stats())
+                for name, operation in self._operations.items()
+            ]
+        rows = []
+        for name, count, total, longest, samples in operations:
+            p50, p95 = np.percentile(samples, [50, 95])
+            times = [float(1000 * value) for value in (p50, p95, longest, total)]
+            rows.append([name, count, *times])
+        rows.sort(key=lambda row: row[-1], reverse=True)
+        return rows
+
+    # Write the summary to a JSON file
+    def dump(self, file_path):
+        keys = ["count", "p50_ms", "p95_ms", "max_ms", "total_ms"]
+        operations = {row[0]: dict(zip(keys, row[1:])) for row in self.summary()}
+        with open(file_path, "w", encoding="utf-8") as perf_file:
+            json.dump({"operations": operations}, perf_file, indent=2)
+
+
+# Timings of the whole application, enabled by the environment variables
+recorder = PerfRecorder(
+    enabled=bool(os.environ.get(PERF_ENV_VAR) or os.environ.get(PERF_FILE_ENV_VAR))
+)
+
+
+# Function to time a block of code with the application recorder:
+#     with span("table.sort"):
+#         ...
+def span(name):
+    return recorder.span(name)
+
+
+# Decorator timing every call of a function with the application recorder
+def timed(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return function(*args, **kwargs)
+            with _Span(recorder, name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class _Operation:
+    __slots__ = ["count", "total", "max", "samples"]
+
+    def __init__(self, max_samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    # Count, total, max and a copy of the samples
+    def stats(self):
+        return self.count, self.total, self.max, np.array(self.samples)
+
+
+class _Span:
+    __slots__ = ["recorder", "name", "start"]
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
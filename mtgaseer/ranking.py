@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from mtgaseer.cleaning import MISSING_TEXT
+
+
+#######################################################
+# FIXED CARD RANKING (PRECOMPUTED RANKS PER STAT)
+#######################################################
+
+# Stats with precomputed ranks
+RANK_STATS = ["GIH WR", "IWD", "GP WR", "ALSA"]
+
+# Stats for which lower values are better (picked earlier)
+ASCENDING_STATS = ["ALSA", "ATA"]
+
+# Cards played in hand fewer times than this get no rank (too few games)
+DEFAULT_MIN_GIH = 200
+
+
+# Function to get the name of the rank column of a stat ("GIH WR Rank")
+def rank_column(stat):
+    return f"{stat} Rank"
+
+
+# Function to add the rank columns of some stats to a card ratings table
+def with_ranks(data, ranking, stats=("GIH WR",), within_rarity=False):
+    return data.assign(
+        **{rank_column(stat): ranking.ranks(stat, within_rarity) for stat in stats}
+    )
+
+
+# Ranks of the cards of one card ratings table (one archetype) for every rank
+# stat, computed once when the table is loaded. Rank 1 is the best card, tied
+# cards share the best rank, and cards seen in hand fewer than `min_gih` times
+# or without a value get no rank (NaN). Ranks and percentiles (100 for the
+# best card, 0 for the worst) are kept over the whole table and within each
+# rarity, as arrays in the row order of the table, so getting the rank of a
+# card while searching or drafting is indexing, not sorting.
+class CardRanking:
+    def __init__(self, data, stats=RANK_STATS, min_gih=DEFAULT_MIN_GIH):
+        self.stats = list(stats)
+        self.min_gih = min_gih
+
+        eligible = data["# GIH"].to_numpy(dtype=np.float64) >= min_gih
+        if "Rarity" in data:
+            rarity = data["Rarity"].fillna(MISSING_TEXT).to_numpy()
+        else:
+            rarity = np.zeros(len(data), dtype=np.int8)
+
+        self._ranks = {}  # (stat, within rarity) -> ranks by row
+        self._percentiles = {}
+        for stat in self.stats:
+            values = pd.Series(data[stat].to_numpy(dtype=np.float64)).where(eligible)
+            ascending = stat in ASCENDING_STATS
+
+            ranks = values.rank(method="min", ascending=ascending)
+            self._store(stat, False, ranks, values.count())
+
+            by_rarity = values.groupby(rarity)
+            ranks = by_rarity.rank(method="min", ascending=ascending)
+            self._store(stat, True, ranks, by_rarity.transform("count"))
+
+    # Function to get the ranks of a stat by row (NaN when not ranked)
+    def ranks(self, stat, within_rarity=False):
+        return self._ranks[stat, within_rarity]
+
+    # Function to get the percentiles of a stat by row (NaN when not ranked)
+    def percentiles(self, stat, within_rarity=False):
+        return self._percentiles[stat, within_rarity]
+
+    def _store(self, stat, within_rarity, ranks, counts):
+        ranks = ranks.to_numpy(dtype=np.float64)
+        counts = np.broadcast_to(np.asarray(counts, dtype=np.float64), ranks.shape)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percentiles = np.where(
+                counts > 1, 100 * (counts - ranks) / (counts - 1), 100.0
+            )
+        percentiles[np.isnan(ranks)] = np.nan
+        self._ranks[stat, within_rarity] = ranks.astype(np.float32)
+        self._percentiles[stat, within_rarity] = percentiles.astype(np.float32)
@@ -0,0 +1,177 @@
+import os
+
+import pandas as pd
+
+from mtgaseer.analysis import biggest_differences
+from mtgaseer.cleaning import format_column, format_win_rate
+from mtgaseer.catalog import DataCatalog, snapshot_label
+from mtgaseer.datasets import ARCHETYPE_NAMES, create_dataset_store
+from mtgaseer.ingest import DEFAULT_INGEST_WORKERS, load_snapshot
+from mtgaseer.ranking import (
+    ASCENDING_STATS,
+    DEFAULT_MIN_GIH,
+    CardRanking,
+    rank_column,
+    with_ranks,
+)
+
+
+#######################################################
+# HEADLESS REPORTS (NO TKINTER)
+#######################################################
+
+# Supported output formats and their file extensions
+REPORT_FORMATS = {"csv": "csv", "json": "json", "md": "md"}
+
+# Decimals kept for numbers in CSV and JSON reports
+REPORT_DECIMALS = 4
+
+# Columns of the ranked card tables
+REPORT_COLUMNS = ["Name", "Color", "Rarity", "ALSA", "# GP", "% GP", "GP WR"]
+REPORT_COLUMNS += ["# GIH", "GIH WR", "IWD"]
+
+
+# Function to rank the cards of a dataset by a stat (missing values last).
+# Cards played in hand fewer than `min_gih` times are left out. Ranks are the
+# ones of the app (CardRanking): tied cards share the best rank, and cards
+# without a value get none.
+def rank_cards(data, sort_by="GIH WR", min_gih=0, top=None):
+    ranking = CardRanking(data, stats=[sort_by], min_gih=min_gih)
+    data = with_ranks(data, ranking, stats=[sort_by])
+    if min_gih:
+        data = data[data["# GIH"] >= min_gih]
+    columns = [col for col in REPORT_COLUMNS if col in data]
+    if sort_by not in columns:
+        columns.append(sort_by)
+    ranked = data[[rank_column(sort_by)] + columns].sort_values(
+        sort_by,
+        ascending=sort_by in ASCENDING_STATS,
+        na_position="last",
+        kind="stable",
+    )
+    ranked = ranked.rename(columns={rank_column(sort_by): "Rank"})
+    ranked["Rank"] = ranked["Rank"].astype("Int64")
+    ranked = ranked.reset_index(drop=True)
+    return ranked.head(top) if top else ranked
+
+
+# Function to compare each archetype with the overall data for one stat, with
+# the difference engine of the app (analysis.biggest_differences): each card
+# comes once, with its most different archetype, biggest absolute difference
+# first. Only cards played in hand at least `min_gih` times in both tables are
+# compared.
+def archetype_deltas(overall, archetypes, stat="GIH WR", min_gih=0, top=None):
+    if min_gih:
+        overall = overall[overall["# GIH"] >= min_gih]
+        archetypes = {
+            code: data[data["# GIH"] >= min_gih] for code, data in archetypes.items()
+        }
+    return biggest_differences(
+        overall, archetypes, stats=[stat], top=top or len(overall)
+    )
+
+
+# Function to find the snapshot of a report: the newest export matching the
+# date and set code (both optional)
+def find_snapshot(catalog, date=None, set_code=None):
+    snapshot = catalog.find(date, set_code)
+    if snapshot is None or None not in catalog.card_ratings_files(snapshot):
+        wanted = [part for part in (set_code, date) if part]
+        raise ValueError(
+            " ".join(["No 17lands card ratings", *wanted, "in", catalog.data_dir])
+        )
+    return snapshot
+
+
+# Function to build every table of the report, keyed by output file name
+def build_report(
+    data_dir,
+    date=None,
+    set_code=None,
+    archetypes=None,
+    sort_by="GIH WR",
+    min_gih=DEFAULT_MIN_GIH,
+    top=None,
+    use_cache=True,
+    workers=DEFAULT_INGEST_WORKERS,
+):
+    catalog = DataCatalog(data_dir)
+    snapshot = find_snapshot(catalog, date, set_code)
+    dataset_store = create_dataset_store(catalog, snapshot, use_cache=use_cache)
+    archetypes = list(ARCHETYPE_NAMES) if archetypes is None else archetypes
+
+    # Parse all the files of the report at the same time
+    keys = [None] + [code for code in archetypes if code in dataset_store]
+    colors = load_snapshot(
+        dataset_store, catalog.colors_file(snapshot), keys, workers=workers
+    )
+
+    overall = dataset_store.get(None)
+    tables = {"cards-overall": rank_cards(overall, sort_by, min_gih, top)}
+    archetype_data = {}
+    for code in archetypes:
+        if code not in dataset_store:
+            print(f"No {code} card ratings for {snapshot_label(snapshot)}")
+            continue
+        archetype_data[code] = dataset_store.get(code)
+        tables[f"cards-{code}"] = rank_cards(
+            archetype_data[code], sort_by, min_gih, top
+        )
+
+    if archetype_data:
+        tables["archetype-deltas"] = archetype_deltas(
+            overall, archetype_data, sort_by, min_gih, top
+        )
+
+    if colors is not None:
+        tables["color-win-rates"] = colors
+    return tables
+
+
+# Function to write the tables of a report in the given formats, returns the
+# paths of the written files
+def write_report(tables, output_dir, formats=("csv",)):
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for name, table in tables.items():
+        for report_format in formats:
+            extension = REPORT_FORMATS[report_format]
+            path = os.path.join(output_dir, f"{name}.{extension}")
+            if report_format == "csv":
+                # float32 noise (-7.700001) is rounded away
+                table.round(REPORT_DECIMALS).to_csv(path, index=False)
+            elif report_format == "json":
+                # Missing values become null, float32 noise is rounded away
+                table.to_json(
+                    path, orient="records", indent=2, double_precision=REPORT_DECIMALS
+                )
+            else:
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(to_markdown(table))
+            written.append(path)
+    return written
+
+
+# Function to render a table as Markdown, formatted like the GUI shows it
+def to_markdown(table):
+    text = pd.DataFrame(
+        {
+            col: table[col].map(format_win_rate)
+            if col == "Win Rate"
+            else format_column(table[col])
+            for col in table.columns
+        }
+    )
+    lines = [
+        _markdown_row(table.columns),
+        _markdown_row("---" for _ in table.columns),
+    ]
+    for row in text.itertuples(index=False):
+        lines.append(_markdown_row(row))
+    return "\n".join(lines) + "\n"
+
+
+# One Markdown table row, with "|" escaped so a cell cannot split the row
+def _markdown_row(values):
+    cells = (str(value).replace("|", "\\|") for value in values)
+    return "| " + " | ".join(cells) + " |"
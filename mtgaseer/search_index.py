@@ -0,0 +1,96 @@
+import numpy as np
+
+
+#######################################################
+# CARD NAME SEARCH INDEX
+#######################################################
+
+# Longest n-gram kept in the index; queries up to this length are answered
+# straight from one posting list, longer ones intersect their n-grams
+MAX_GRAM = 3
+
+
+# Substring search over card names. Names are lowercased and split into every
+# 1, 2 and 3 character n-gram once; each n-gram points to the sorted list of
+# distinct names containing it. A query intersects the posting lists of its
+# n-grams and only checks the remaining names. When the user keeps typing
+# (the new query contains the previous one) only the previous matches are
+# checked. Queries are plain text, never regular expressions.
+class NameIndex:
+    def __init__(self, names):
+        lowered = [str(name).lower() for name in names]
+        # Distinct names, and for each row the distinct name it holds
+        self._names, self._name_of_row = np.unique(
+            np.array(lowered, dtype=object), return_inverse=True
+        )
+        self._postings = _build_postings(self._names)
+        self._all_rows = np.arange(len(lowered), dtype=np.intp)
+        # Previous (query, matching names), replaced as a whole so a search
+        # running in a worker thread never sees half of it
+        self._last = ("", np.arange(len(self._names), dtype=np.intp))
+
+    # Build the index for the "Name" column of a card ratings table
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["Name"].fillna(""))
+
+    # Return the row positions whose name contains the query (case-insensitive)
+    def search(self, query):
+        query = query.lower()
+        last_query, last_matches = self._last
+        if not query:
+            matches = np.arange(len(self._names), dtype=np.intp)
+        elif last_query and last_query in query:
+            # The query was extended: narrow down the previous result
+            matches = self._check(last_matches, query)
+        else:
+            matches = self._lookup(query)
+
+        self._last = (query, matches)
+        if len(matches) == len(self._names):
+            return self._all_rows
+        return np.flatnonzero(np.isin(self._name_of_row, matches))
+
+    # Find the names containing a query using the posting lists
+    def _lookup(self, query):
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query, _EMPTY)
+
+        postings = []
+        for start in range(len(query) - MAX_GRAM + 1):
+            posting = self._postings.get(query[start : start + MAX_GRAM])
+            if posting is None:
+                return _EMPTY
+            postings.append(posting)
+
+        # Intersect from the shortest list, then check the actual substring
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return _EMPTY
+        return self._check(candidates, query)
+
+    def _check(self, candidates, query):
+        names = self._names
+        return np.array(
+            [i for i in candidates if query in names[i]], dtype=np.intp
+        )
+
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+# Function to map every n-gram (up to MAX_GRAM characters) to the sorted
+# positions of the names containing it
+def _build_postings(names):
+    postings = {}
+    for position, name in enumerate(names):
+        grams = set()
+        for size in range(1, MAX_GRAM + 1):
+            for start in range(len(name) - size + 1):
+                grams.add(name[start : start + size])
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+    return {gram: np.array(found, dtype=np.intp) for gram, found in postings.items()}
@@ -0,0 +1,106 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+#######################################################
+# DEBOUNCED BACKGROUND SEARCH
+#######################################################
+
+# Time to wait after the last keystroke before searching
+DEFAULT_DELAY_MS = 150
+
+# How often the Tk thread checks for finished searches
+DEFAULT_POLL_MS = 15
+
+
+# Runs searches typed in a Tk window without blocking it. Keystrokes are
+# coalesced with a debounce (`root.after`), the search itself runs in a worker
+# thread and the result is handed back to the Tk thread through a queue polled
+# with `after`. Only the result of the latest query is applied; results of
+# stale queries are dropped, and queued stale queries are never run.
+#
+# `prepare(query)` is called on the Tk thread and must return the function run
+# by the worker (so it can capture the current dataset), `apply(result)` is
+# called on the Tk thread with what that function returned.
+class SearchScheduler:
+    def __init__(
+        self,
+        widget,
+        prepare,
+        apply,
+        delay_ms=DEFAULT_DELAY_MS,
+        poll_ms=DEFAULT_POLL_MS,
+    ):
+        self.widget = widget
+        self.prepare = prepare
+        self.apply = apply
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._results = queue.Queue()
+        self._generation = 0  # Increased for every search started or cancelled
+        self._pending_after = None  # Debounce timer
+        self._outstanding = 0  # Jobs submitted and not reported back yet
+        self._polling = False
+
+    # Search for a query once the user stops typing for `delay_ms`
+    def schedule(self, query):
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+        self._pending_after = self.widget.after(self.delay_ms, self._start, query)
+
+    # Forget the pending and running searches (their results are dropped)
+    def cancel(self):
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+            self._pending_after = None
+        self._generation += 1
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _start(self, query):
+        self._pending_after = None
+        self._generation += 1
+        job = self.prepare(query)
+        self._outstanding += 1
+        self._executor.submit(self._run, self._generation, job)
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    # Worker thread: skip queries that are already stale, run the others.
+    # Every job reports back, so the Tk thread knows when to stop polling.
+    def _run(self, generation, job):
+        if generation != self._generation:
+            self._results.put((generation, None, None))
+            return
+        try:
+            self._results.put((generation, job(), None))
+        except Exception as error:
+            self._results.put((generation, None, error))
+
+    # Tk thread: apply the result of the latest query, poll while jobs run
+    def _poll(self):
+        latest = None
+        while True:
+            try:
+                reported = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if reported[0] == self._generation:
+                latest = reported
+
+        if self._outstanding:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+        if latest is not None:
+            _, result, error = latest
+            if error is not None:
+                raise error
+            self.apply(result)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from mtgaseer.cleaning import MISSING_TEXT
+
+
+#######################################################
+# PRECOMPUTED SORT KEYS
+#######################################################
+
+
+# Sort keys for one dataset. For every column it keeps (once, lazily) the
+# dense rank of each row, with equal values sharing a rank and missing values
+# ("-", blank or NaN) flagged apart. Sorting any subset of the rows is then an
+# argsort of small integers instead of reading and converting every value.
+class SortKeys:
+    def __init__(self, data):
+        self.data = data
+        self._keys = {}  # column -> (ranks, missing mask, highest rank)
+
+    # Return the given row positions ordered by a column. Missing values are
+    # always last, and rows with equal values keep their current order.
+    def order(self, rows, column, reverse=False):
+        ranks, missing, highest = self._column_keys(column)
+        rows = np.asarray(rows, dtype=np.intp)
+        keys = ranks[rows]
+        if reverse:
+            keys = highest - keys
+        keys = np.where(missing[rows], highest + 1, keys)
+        return rows[np.argsort(keys, kind="stable")]
+
+    def _column_keys(self, column):
+        keys = self._keys.get(column)
+        if keys is None:
+            keys = self._keys[column] = _build_keys(self.data[column])
+        return keys
+
+
+# Function to compute dense ranks and the missing mask of a column
+def _build_keys(series):
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype="float64")
+        missing = np.isnan(values)
+    else:
+        # Text columns are compared case-insensitively
+        values = series.fillna("").astype(str).str.lower().to_numpy(dtype=object)
+        missing = (values == "") | (values == MISSING_TEXT)
+
+    ranks = np.zeros(len(values), dtype=np.int64)
+    present = ~missing
+    if present.any():
+        _, ranks[present] = np.unique(values[present], return_inverse=True)
+    highest = int(ranks.max()) if len(ranks) else 0
+    return ranks, missing, highest
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+
+#######################################################
+# CARD PAIR SYNERGY (SPARSE CO-OCCURRENCE COUNTS)
+#######################################################
+
+# Kinds of pairs: both cards in the deck (compared with their GP WR) and both
+# cards in hand (compared with their GIH WR)
+SYNERGY_KINDS = ["GP", "GIH"]
+
+# Games two cards must be counted together for the pair to be kept
+SYNERGY_MIN_GAMES = 100
+
+# Columns of the partners of a card, in display order
+SYNERGY_COLUMNS = ["Partner", "# Games", "Pair WR", "Expected WR", "Lift"]
+
+# Pairs are keyed by (first id << _KEY_SHIFT) | second id, first id < second id
+_KEY_SHIFT = 32
+_SECOND_MASK = (1 << _KEY_SHIFT) - 1
+
+
+# Games and wins of every pair of cards played together, for every
+# SYNERGY_KINDS, kept sparse: only the pairs seen together are stored, as
+# sorted int64 keys and a [pair, kind, games / wins] count array. The cards of
+# one game_data file (one set) are first counted in a dense card × card block,
+# which is folded into the sparse counts when cards of another file come in,
+# so memory grows with the pairs seen, never with the square of all the cards
+# of all the sets.
+class PairCounts:
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros((0, len(SYNERGY_KINDS), 2), dtype=np.int64)
+        self._block_ids = None  # Card ids of the dense block
+        self._block = None  # [kind, games / wins, card, card]
+
+    def __len__(self):
+        self.flush()
+        return len(self.keys)
+
+    # Function to count the games of a chunk: `card_ids` are the ids of the
+    # card columns, `present` has one (games × cards) boolean array per
+    # SYNERGY_KINDS and `won` is the result of every game
+    def add(self, card_ids, present, won):
+        if self._block_ids is None or not np.array_equal(self._block_ids, card_ids):
+            self.flush()
+            size = len(card_ids)
+            self._block_ids = np.asarray(card_ids)
+            self._block = np.zeros((len(SYNERGY_KINDS), 2, size, size), np.int64)
+        # Games together are the Gram matrix of the card indicators
+        for kind, present_cards in enumerate(present):
+            present_cards = present_cards.astype(np.float32)
+            won_cards = present_cards[won]
+            together = present_cards.T @ present_cards
+            self._block[kind, 0] += np.rint(together).astype(np.int64)
+            self._block[kind, 1] += np.rint(won_cards.T @ won_cards).astype(np.int64)
+
+    # Function to add the counts of pairs given by card ids ([pair, kind,
+    # games / wins] counts)
+    def add_pairs(self, first_ids, second_ids, counts):
+        first_ids = np.asarray(first_ids, dtype=np.int64)
+        second_ids = np.asarray(second_ids, dtype=np.int64)
+        keys = np.minimum(first_ids, second_ids) << _KEY_SHIFT
+        keys |= np.maximum(first_ids, second_ids)
+        keys, inverse = np.unique(
+            np.concatenate([self.keys, keys]), return_inverse=True
+        )
+        merged = np.zeros((len(keys), len(SYNERGY_KINDS), 2), dtype=np.int64)
+        np.add.at(merged, inverse, np.concatenate([self.counts, counts]))
+        self.keys, self.counts = keys, merged
+
+    # Function to add the counts of another PairCounts, `card_ids` giving our
+    # id of each of its card ids
+    def merge(self, other, card_ids):
+        first_ids, second_ids, counts = other.pairs()
+        self.add_pairs(card_ids[first_ids], card_ids[second_ids], counts)
+
+    # Function to get the first ids, second ids and counts of all the pairs
+    def pairs(self):
+        self.flush()
+        return self.keys >> _KEY_SHIFT, self.keys & _SECOND_MASK, self.counts
+
+    # Fold the dense block into the sparse counts (the pairs seen together)
+    def flush(self):
+        if self._block is None:
+            return
+        first, second = np.triu_indices(len(self._block_ids), k=1)
+        counts = self._block[:, :, first, second]  # [kind, games / wins, pair]
+        together = counts[:, 0].any(axis=0)
+        self._block_ids, block_ids, self._block = None, self._block_ids, None
+        self.add_pairs(
+            block_ids[first[together]],
+            block_ids[second[together]],
+            counts[..., together].transpose(2, 0, 1),
+        )
+
+
+# Best partners of every card, ready to query: for every SYNERGY_KINDS, the
+# pairs played together at least `min_games` times, stored in both directions
+# and grouped by card (CSR layout) with the highest lift first. Looking up the
+# partners of a card is a slice of the arrays. The lift is the win rate of the
+# pair minus the expected one, the average of the win rates of both cards
+# (percentage points).
+class SynergyMatrix:
+    def __init__(self, names, arrays):
+        self.names = np.asarray(names, dtype=object)
+        self._arrays = arrays  # "{kind}_{indptr, partners, games, ...}" -> array
+        self._ids = {name: card_id for card_id, name in enumerate(self.names)}
+
+    # Function to build the matrix from pair counts and the games and wins of
+    # every card ([kind, games / wins, card id] counts), cards named by id
+    @classmethod
+    def from_counts(cls, names, first_ids, second_ids, counts, card_counts, min_games):
+        arrays = {}
+        for kind_index, kind in enumerate(SYNERGY_KINDS):
+            games, wins = counts[:, kind_index, 0], counts[:, kind_index, 1]
+            kept = games >= max(min_games, 1)
+            first, second = first_ids[kept], second_ids[kept]
+            games, wins = games[kept], wins[kept]
+            card_games, card_wins = card_counts[kind_index]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                card_win_rates = 100 * card_wins / card_games
+            win_rates = 100 * wins / games
+            expected = (card_win_rates[first] + card_win_rates[second]) / 2
+            lifts = win_rates - expected
+
+            # Both directions, grouped by card and sorted by lift
+            cards = np.concatenate([first, second])
+            partners = np.concatenate([second, first])
+            games, win_rates, lifts = [
+                np.tile(values, 2) for values in (games, win_rates, lifts)
+            ]
+            order = np.lexsort((-lifts, cards))
+            indptr = np.searchsorted(cards[order], np.arange(len(names) + 1))
+            arrays[f"{kind}_indptr"] = indptr.astype(np.int64)
+            arrays[f"{kind}_partners"] = partners[order].astype(np.int32)
+            arrays[f"{kind}_games"] = games[order].astype(np.int32)
+            arrays[f"{kind}_win_rates"] = win_rates[order].astype(np.float32)
+            arrays[f"{kind}_lifts"] = lifts[order].astype(np.float32)
+        return cls(names, arrays)
+
+    # Function to get the partners of a card (highest lift first) as a
+    # DataFrame of SYNERGY_COLUMNS, at most `top` of them, with at least
+    # `min_games` games together. Empty for unknown cards.
+    def partners(self, name, kind="GIH", top=None, min_games=0):
+        card_id = self._ids.get(name)
+        start = end = 0
+        if card_id is not None:
+            start, end = self._arrays[f"{kind}_indptr"][card_id : card_id + 2]
+        rows = slice(start, end)
+        games = self._arrays[f"{kind}_games"][rows]
+        selected = np.flatnonzero(games >= min_games)[:top]
+        win_rates = self._arrays[f"{kind}_win_rates"][rows][selected]
+        lifts = self._arrays[f"{kind}_lifts"][rows][selected]
+        return pd.DataFrame(
+            {
+                "Partner": self.names[self._arrays[f"{kind}_partners"][rows][selected]],
+                "# Games": games[selected],
+                "Pair WR": win_rates,
+                "Expected WR": win_rates - lifts,
+                "Lift": lifts,
+            }
+        )
+
+    # Function to get the names of the cards having partners, sorted
+    def card_names(self):
+        has_partners = np.zeros(len(self.names), dtype=bool)
+        for kind in SYNERGY_KINDS:
+            has_partners |= np.diff(self._arrays[f"{kind}_indptr"]) > 0
+        return sorted(self.names[has_partners])
+
+    # Function to save the matrix to a compressed .npz file
+    def save(self, file_path):
+        with open(file_path, "wb") as synergy_file:
+            np.savez_compressed(
+                synergy_file, names=self.names.astype(str), **self._arrays
+            )
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as saved:
+            arrays = {key: saved[key] for key in saved.files if key != "names"}
+            return cls(saved["names"].astype(object), arrays)
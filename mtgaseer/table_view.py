@@ -0,0 +1,249 @@
+import numpy as np
+
+from mtgaseer.cleaning import format_value
+from mtgaseer.perf import timed
+from mtgaseer.sorting import SortKeys
+
+
+#######################################################
+# TREEVIEW BACKED BY A DATAFRAME
+#######################################################
+
+# Fallbacks used before the widget is drawn and rows can be measured
+DEFAULT_VISIBLE_ROWS = 10
+DEFAULT_ROW_HEIGHT = 20
+
+# Number of rows scrolled by one mouse wheel notch
+MOUSE_WHEEL_ROWS = 3
+
+
+# Shows the rows of a DataFrame in a ttk.Treeview. The DataFrame is the source
+# of truth: the view only keeps the positions of the rows being shown (after
+# search/filters) and sorting is done on precomputed keys of the data, never by
+# reading cells back from the widget. `columns` is a list of
+# (heading, data column) pairs, `formatters` optionally maps a data column to
+# the function used to turn its values into text. When a `column_widths`
+# cache is given, columns are sized for the whole dataset on `set_data`.
+#
+# With `virtual=True` the view is windowed: only the rows fitting in the widget
+# exist as Treeview items, they are reused while scrolling, and `scrollbar`
+# (which must not be attached to the tree itself) scrolls through the whole
+# result instead. This keeps tens of thousands of rows responsive.
+class TableView:
+    def __init__(
+        self,
+        tree,
+        columns,
+        formatters=None,
+        on_render=None,
+        scrollbar=None,
+        virtual=False,
+        column_widths=None,
+    ):
+        self.tree = tree
+        self.column_widths = column_widths  # ColumnWidthCache, sized per dataset
+        self.scrollbar = scrollbar
+        self.virtual = virtual
+        self.headings = [heading for heading, _ in columns]
+        self.data_columns = dict(columns)
+        self.formatters = formatters or {}
+        self.on_render = on_render  # Called after the rows have been redrawn
+
+        self.data = None
+        self.rows = np.empty(0, dtype=np.intp)  # Row positions, in display order
+        self.sort_column = None  # Heading currently sorted by
+        self.sort_reverse = False
+        self._sort_keys = None
+        self._next_reverse = {heading: False for heading in self.headings}
+
+        # Windowed mode state: first shown row, number of rows that fit and the
+        # pool of Treeview items reused for them
+        self.offset = 0
+        self._visible_rows = int(self.tree.cget("height")) or DEFAULT_VISIBLE_ROWS
+        self._pool = []
+
+        for heading in self.headings:
+            self.tree.heading(
+                heading,
+                text=heading,
+                anchor="center",
+                command=lambda h=heading: self.sort_by(h, self._next_reverse[h]),
+            )
+
+        if self.virtual:
+            self._bind_scrolling()
+
+    # Replace the dataset shown by the table (all rows are shown)
+    def set_data(self, data):
+        self.data = data
+        self._sort_keys = SortKeys(data)
+        if self.column_widths is not None:
+            self.column_widths.resize_columns(
+                self.tree, data, self.data_columns.items(), self.formatters
+            )
+        self.show()
+
+    # Show only the given row positions of the dataset (None shows every row),
+    # keeping the current sort order
+    def show(self, rows=None):
+        if rows is None:
+            rows = np.arange(len(self.data), dtype=np.intp)
+        self.rows = self._sorted(rows)
+        self.refresh()
+
+    # Sort the shown rows by a column heading
+    @timed("table.sort")
+    def sort_by(self, heading, reverse=False):
+        self.sort_column = heading
+        self.sort_reverse = reverse
+        self._next_reverse[heading] = not reverse  # Next click flips the order
+        self.rows = self._sorted(self.rows)
+        self.update_sort_column_header()
+        self.refresh()
+
+    # Add an arrow symbol to the sorted column header, remove it from the others
+    def update_sort_column_header(self):
+        for heading in self.headings:
+            if heading == self.sort_column:
+                arrow = "↑" if self.sort_reverse else "↓"
+                self.tree.heading(heading, text=f"{heading} {arrow}")
+            else:
+                self.tree.heading(heading, text=heading)
+
+    # Redraw the widget after the shown rows changed
+    @timed("table.render")
+    def refresh(self):
+        self.offset = 0
+        self._draw()
+        if self.on_render is not None:
+            self.on_render(self)
+
+    # Scroll the windowed table by a number of rows
+    def scroll(self, rows):
+        self._scroll_to(self.offset + rows)
+
+    # Scrollbar command for the windowed table ("moveto" and "scroll" actions)
+    def yview(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self.scroll(int(amount) * max(1, self._visible_rows - 1))
+        else:
+            self.scroll(int(amount))
+
+    def _draw(self):
+        if not self.virtual:
+            # Every row is an item, redrawn in one batch
+            self.tree.delete(*self.tree.get_children())
+            for values in self.row_values(self.rows):
+                self.tree.insert("", "end", values=values)
+            return
+
+        shown = self.rows[self.offset : self.offset + self._visible_rows]
+        self._resize_pool(len(shown))
+        self.tree.selection_remove(*self.tree.selection())
+        for iid, values in zip(self._pool, self.row_values(shown)):
+            self.tree.item(iid, values=values)
+        self._update_scrollbar()
+
+    # Create or delete pooled items so there is exactly one per shown row
+    def _resize_pool(self, count):
+        while len(self._pool) < count:
+            self._pool.append(self.tree.insert("", "end"))
+        if len(self._pool) > count:
+            self.tree.delete(*self._pool[count:])
+            del self._pool[count:]
+
+    def _scroll_to(self, offset):
+        last_offset = max(0, len(self.rows) - self._visible_rows)
+        offset = min(max(0, offset), last_offset)
+        if offset != self.offset:
+            self.offset = offset
+            self._draw()
+
+    def _update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        total = len(self.rows)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.offset / total
+        last = min(total, self.offset + self._visible_rows) / total
+        self.scrollbar.set(first, last)
+
+    def _bind_scrolling(self):
+        if self.scrollbar is not None:
+            self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel)  # Windows and macOS
+        self.tree.bind("<Button-4>", lambda event: self._scroll_event(-1))  # Linux
+        self.tree.bind("<Button-5>", lambda event: self._scroll_event(1))
+        self.tree.bind("<Up>", lambda event: self._on_arrow_key(-1))
+        self.tree.bind("<Down>", lambda event: self._on_arrow_key(1))
+        self.tree.bind("<Prior>", lambda event: self._scroll_event(-self._page()))
+        self.tree.bind("<Next>", lambda event: self._scroll_event(self._page()))
+
+    # Recompute how many rows fit when the widget is resized
+    def _on_configure(self, event):
+        rows_height = event.height - self._header_height()
+        visible_rows = max(1, rows_height // self._row_height())
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            # Keep the last page full when growing at the end of the table
+            last_offset = max(0, len(self.rows) - visible_rows)
+            self.offset = min(self.offset, last_offset)
+            self._draw()
+
+    def _on_mouse_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_event(-step * MOUSE_WHEEL_ROWS)
+
+    def _scroll_event(self, rows):
+        self.scroll(rows)
+        return "break"  # The tree itself never scrolls
+
+    # Moving past the first/last pooled item scrolls the data under it
+    def _on_arrow_key(self, direction):
+        focus = self.tree.focus()
+        if not self._pool or focus not in self._pool:
+            return None
+        edge = self._pool[0] if direction < 0 else self._pool[-1]
+        if focus != edge:
+            return None
+        self.scroll(direction)
+        self.tree.selection_set(focus)
+        return "break"
+
+    def _page(self):
+        return max(1, self._visible_rows - 1)
+
+    # Height of one row, measured on a shown item (bbox is empty until mapped)
+    def _row_height(self):
+        bbox = self.tree.bbox(self._pool[0]) if self._pool else ""
+        return bbox[3] if bbox else DEFAULT_ROW_HEIGHT
+
+    def _header_height(self):
+        bbox = self.tree.bbox(self._pool[0]) if self._pool else ""
+        return bbox[1] if bbox else DEFAULT_ROW_HEIGHT
+
+    # Return the display text of the given row positions, one list per row
+    def row_values(self, rows):
+        columns = [self.data_columns[heading] for heading in self.headings]
+        subset = self.data[columns].iloc[rows]
+        formatters = [
+            self.formatters.get(col, lambda value, col=col: format_value(col, value))
+            for col in columns
+        ]
+        return [
+            [formatter(value) for formatter, value in zip(formatters, row)]
+            for row in subset.itertuples(index=False)
+        ]
+
+    def _sorted(self, rows):
+        if self.sort_column is None:
+            return np.asarray(rows, dtype=np.intp)
+        return self._sort_keys.order(
+            rows, self.data_columns[self.sort_column], self.sort_reverse
+        )
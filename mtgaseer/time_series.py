@@ -0,0 +1,285 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from mtgaseer.cleaning import read_card_ratings
+from mtgaseer.columnar_cache import CACHE_DIR_NAME
+from mtgaseer.datasets import ARCHETYPE_CODES
+
+
+#######################################################
+# TIME SERIES OF CARD STATS (ONE VALUE PER SNAPSHOT DATE)
+#######################################################
+
+# Stats kept for every card, archetype and date
+TREND_STATS = ["GIH WR", "# GIH", "GP WR", "IWD", "ALSA"]
+
+# Archetype axis of the store: the overall data first, then the two colors
+TIME_SERIES_ARCHETYPES = [None] + ARCHETYPE_CODES
+
+# Folder, inside the cache folder of the data folder, holding one store per set
+TIME_SERIES_DIR_NAME = "time-series"
+
+# Changing this number makes older stores start again from scratch
+TIME_SERIES_FORMAT_VERSION = 1
+
+# Files ingested by update between two flushes of the values and meta.json
+TIME_SERIES_BATCH_FILES = 32
+
+# Cards reserved in every date block of a new store (grown when needed)
+_MIN_CARD_CAPACITY = 512
+
+_META_FILE = "meta.json"
+
+
+# Append-only history of the card stats of one set, as a single float32 file
+# laid out date × archetype × stat × card and memory-mapped on reads. A new
+# snapshot date appends one block at the end of the file, so adding a daily
+# export never rewrites the older ones, and a query only touches the blocks
+# of the dates it asks for (milliseconds, instead of parsing N daily CSVs).
+# Dates are stored in arrival order (late exports can be backfilled) and
+# sorted on reads. Card names get a stable column the first time they are
+# seen; when the reserved columns run out the file is rewritten once with
+# twice the room.
+class TimeSeriesStore:
+    def __init__(self, store_dir, stats=TREND_STATS):
+        self.store_dir = store_dir
+        self.stats = list(stats)
+        self._stat_index = {stat: index for index, stat in enumerate(self.stats)}
+        self._archetype_index = {
+            code: index for index, code in enumerate(TIME_SERIES_ARCHETYPES)
+        }
+
+        meta = _read_meta(store_dir)
+        if (
+            meta is None
+            or meta.get("version") != TIME_SERIES_FORMAT_VERSION
+            or meta.get("stats") != self.stats
+        ):
+            meta = {
+                "version": TIME_SERIES_FORMAT_VERSION,
+                "stats": self.stats,
+                "capacity": _MIN_CARD_CAPACITY,
+                "values_file": f"values-{_MIN_CARD_CAPACITY}.f32",
+                "cards": [],
+                "dates": [],
+                "files": {},  # "date/code" -> [mtime_ns, size] of the ingested CSV
+            }
+        self._meta = meta
+        self._card_index = {name: index for index, name in enumerate(meta["cards"])}
+        self._values = None  # Read-only memory map, opened on the first query
+        self._writer = None  # Writable memory map, open during an update
+
+    # Snapshot dates in the store, oldest first
+    def dates(self):
+        return sorted(self._meta["dates"])
+
+    def card_names(self):
+        return list(self._meta["cards"])
+
+    # Function to add the stats of one card ratings table (one archetype of one
+    # date). Ingesting the same date and archetype again replaces its values.
+    def ingest(self, date, archetype, data):
+        self._add_dates([date])
+        try:
+            self._write(date, archetype, data)
+        finally:
+            self._commit()
+
+    # Function to ingest the card ratings files of a set that are new or changed
+    # since the last update. The files are parsed by `loader` one at a time and
+    # written straight into the values, which are flushed with meta.json once
+    # every `batch_files` files, so an interrupted update keeps the batches
+    # done. `progress(done, total, file_key)` is called after each file.
+    # Returns the number of files ingested.
+    def update(
+        self,
+        catalog,
+        set_code,
+        loader=read_card_ratings,
+        batch_files=TIME_SERIES_BATCH_FILES,
+        progress=None,
+    ):
+        sources = {}
+        for snapshot in catalog.snapshots():
+            if snapshot.set_code != set_code:
+                continue
+            for code, file_path in catalog.card_ratings_files(snapshot).items():
+                if code not in self._archetype_index:
+                    continue
+                file_key = f"{snapshot.date}/{code or ''}"
+                stat = os.stat(file_path)
+                signature = [stat.st_mtime_ns, stat.st_size]
+                if self._meta["files"].get(file_key) == signature:
+                    continue
+                sources[file_key] = (snapshot.date, code, file_path, signature)
+
+        # Written one after the other, in the order of the catalog
+        file_keys = list(sources)
+        for start in range(0, len(file_keys), batch_files):
+            batch = file_keys[start : start + batch_files]
+            self._add_dates([sources[file_key][0] for file_key in batch])
+            try:
+                for done, file_key in enumerate(batch, start + 1):
+                    date, code, file_path, signature = sources[file_key]
+                    self._write(date, code, loader(file_path))
+                    self._meta["files"][file_key] = signature
+                    if progress is not None:
+                        progress(done, len(file_keys), file_key)
+            finally:
+                self._commit()
+        return len(file_keys)
+
+    # Function to get one stat of every card over time: the sorted dates, the
+    # card names and a date × card array (NaN where a card has no value)
+    def series(self, stat, archetype=None):
+        dates = np.array(self._meta["dates"], dtype="datetime64[D]")
+        order = np.argsort(dates, kind="stable")
+        values = self._query(order, stat, archetype)
+        return dates[order], np.array(self._meta["cards"], dtype=object), values
+
+    # Function to get the change of a stat for every card over the dates of a
+    # window ending at `end_date`: last value minus first value, NaN for cards
+    # with fewer than two values in the window. Returned as a Series by name.
+    def trend(self, stat, archetype=None, end_date=None, window_days=14):
+        dates = np.array(self._meta["dates"], dtype="datetime64[D]")
+        if not len(dates):
+            return pd.Series(dtype=np.float32)
+        end = np.datetime64(end_date or dates.max(), "D")
+        chosen = np.flatnonzero((dates >= end - window_days) & (dates <= end))
+        chosen = chosen[np.argsort(dates[chosen], kind="stable")]
+        if len(chosen) < 2:
+            return pd.Series(dtype=np.float32)
+
+        window = self._query(chosen, stat, archetype)  # date × card
+        valid = ~np.isnan(window)
+        first = valid.argmax(axis=0)
+        last = len(chosen) - 1 - valid[::-1].argmax(axis=0)
+        cards = np.arange(window.shape[1])
+        drift = window[last, cards] - window[first, cards]
+        drift[valid.sum(axis=0) < 2] = np.nan
+        return pd.Series(drift, index=self._meta["cards"], dtype=np.float32)
+
+    # Values of a stat for the given date positions (in that order)
+    def _query(self, positions, stat, archetype):
+        card_count = len(self._meta["cards"])
+        if not len(positions):
+            return np.empty((0, card_count), dtype=np.float32)
+        if self._values is None:
+            self._values = self._memmap("r")
+        archetype_index = self._archetype_index[archetype]
+        stat_index = self._stat_index[stat]
+        # Fancy indexing copies only the chosen blocks out of the map
+        return self._values[positions, archetype_index, stat_index, :card_count]
+
+    def _block_shape(self):
+        return (len(TIME_SERIES_ARCHETYPES), len(self.stats), self._meta["capacity"])
+
+    def _values_path(self):
+        return os.path.join(self.store_dir, self._meta["values_file"])
+
+    def _memmap(self, mode):
+        shape = (len(self._meta["dates"]),) + self._block_shape()
+        return np.memmap(self._values_path(), dtype=np.float32, mode=mode, shape=shape)
+
+    # Function to add an empty (NaN) block at the end of the file for each of
+    # the dates not in the store yet. Bytes left by an interrupted update (not
+    # in meta.json) are cut off first.
+    def _add_dates(self, dates):
+        known = set(self._meta["dates"])
+        new_dates = [date for date in dict.fromkeys(dates) if date not in known]
+        if not new_dates:
+            return
+        self._close_writer()
+        os.makedirs(self.store_dir, exist_ok=True)
+        block = np.full(self._block_shape(), np.nan, dtype=np.float32)
+        path = self._values_path()
+        with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+            file.truncate(len(self._meta["dates"]) * block.nbytes)
+            file.seek(0, os.SEEK_END)
+            for _ in new_dates:
+                block.tofile(file)
+        self._meta["dates"].extend(new_dates)
+        self._values = None
+
+    # Function to write the stats of one table into the block of its date
+    # (added before with _add_dates), through a writable map kept open until
+    # the next _commit
+    def _write(self, date, archetype, data):
+        names = pd.unique(data["Name"].to_numpy())
+        new_names = [name for name in names if name not in self._card_index]
+        if len(self._card_index) + len(new_names) > self._meta["capacity"]:
+            self._close_writer()
+            self._grow(len(self._card_index) + len(new_names))
+        for name in new_names:
+            self._card_index[name] = len(self._meta["cards"])
+            self._meta["cards"].append(name)
+
+        if self._writer is None:
+            self._writer = self._memmap("r+")
+        position = self._meta["dates"].index(date)
+        columns = [self._card_index[name] for name in data["Name"]]
+        slot = self._writer[position, self._archetype_index[archetype]]
+        slot[:] = np.nan
+        slot[:, columns] = data[self.stats].to_numpy(dtype=np.float32).T
+
+    # Function to flush the values written and then save meta.json
+    def _commit(self):
+        self._close_writer()
+        self._write_meta()
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.flush()
+            self._writer = None
+        self._values = None
+
+    # Function to rewrite the values with room for more cards (rare: a set has a
+    # fixed card pool). The new file gets a new name, so meta.json always
+    # describes a complete file.
+    def _grow(self, card_count):
+        capacity = self._meta["capacity"]
+        while capacity < card_count:
+            capacity *= 2
+        old_path = self._values_path()
+        old_values = self._memmap("r") if self._meta["dates"] else None
+
+        self._meta["capacity"] = capacity
+        self._meta["values_file"] = f"values-{capacity}.f32"
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(self._values_path(), "wb") as file:
+            for position in range(len(self._meta["dates"])):
+                block = np.full(self._block_shape(), np.nan, dtype=np.float32)
+                block[..., : old_values.shape[-1]] = old_values[position]
+                block.tofile(file)
+        del old_values
+        self._values = None
+        self._write_meta()
+        if os.path.exists(old_path) and old_path != self._values_path():
+            os.remove(old_path)
+
+    def _write_meta(self):
+        # Written last and atomically, so a half written update is never used
+        temp_path = os.path.join(self.store_dir, _META_FILE + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._meta, file)
+        os.replace(temp_path, os.path.join(self.store_dir, _META_FILE))
+
+
+# Function to open the time series store of a set, kept in the cache folder of
+# the data folder of a catalog
+def open_time_series(catalog, set_code, stats=TREND_STATS):
+    store_dir = os.path.join(
+        catalog.data_dir, CACHE_DIR_NAME, TIME_SERIES_DIR_NAME, set_code or "_"
+    )
+    return TimeSeriesStore(store_dir, stats)
+
+
+def _read_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, _META_FILE), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None